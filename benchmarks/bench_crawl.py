@@ -0,0 +1,89 @@
+"""Benchmark de la crawl completa (página (full) + subpáginas) contra un servidor local.
+
+Compara la configuración fija anterior (1 petición por dominio, 1 s de
+retardo) con la concurrencia adaptativa. Cada variante se lanza con
+``scrapy crawl`` en un subproceso, sin pipelines ni caché de páginas (para
+que todas las variantes descarguen y parseen todo), y se comprueba que emite
+cada frase esperada una sola vez y que sigue todas las páginas: sale con
+código 1 si alguna variante no lo cumple. Uso::
+
+    python -m benchmarks.bench_crawl --rows-per-letter 200 --latency 0.3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from latin_phrases_scraper.spiders.wikipedia_spider import row_key
+
+from benchmarks.local_site import LocalSite, build_pages, expected_phrases
+
+VARIANTS = {
+    'fija': [
+        '-s', 'ADAPTIVE_CONCURRENCY_ENABLED=False',
+        '-s', 'CONCURRENT_REQUESTS_PER_DOMAIN=1',
+        '-s', 'DOWNLOAD_DELAY=1',
+    ],
+    'adaptativa': [],
+}
+
+
+def run_crawl(start_url, extra_args):
+    """Ejecuta la crawl y devuelve (segundos, claves ``row_key`` de las filas exportadas)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'items.jsonl')
+        command = [
+            sys.executable, '-m', 'scrapy', 'crawl', 'wikipedia_latin',
+            '-a', f'start_url={start_url}',
+            '-O', output,
+            '-s', 'ITEM_PIPELINES={}',
+            '-s', 'ROBOTSTXT_OBEY=False',
+            '-s', 'LOG_LEVEL=WARNING',
+            '-s', 'PAGE_CACHE_ENABLED=False',
+            '-s', f'RUN_REPORT_PATH={os.path.join(tmp, "run_report.json")}',
+        ] + extra_args
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        elapsed = time.perf_counter() - start
+        with open(output, encoding='utf-8') as f:
+            keys = [row_key(item['latin_phrase'], item.get('translation'))
+                    for item in map(json.loads, f)]
+    return elapsed, keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows-per-letter', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+
+    pages = build_pages(rows_per_letter=args.rows_per_letter)
+    expected = expected_phrases(pages)
+    failures = 0
+    with LocalSite(pages, latency=args.latency) as site:
+        for name, extra_args in VARIANTS.items():
+            site.requests.clear()
+            elapsed, keys = run_crawl(site.start_url, extra_args)
+            followed = sum(1 for path in pages if site.requests[path])
+            problems = []
+            if len(keys) != len(set(keys)):
+                problems.append(f"{len(keys) - len(set(keys))} frases repetidas")
+            if set(keys) != expected:
+                problems.append(f"{len(expected - set(keys))} frases esperadas no emitidas")
+            if followed != len(pages):
+                problems.append(f"páginas seguidas: {followed} de {len(pages)}")
+            print(f"{name:<11} {elapsed:>7.2f}s  {len(set(keys))} frases únicas  "
+                  f"{followed} páginas  {'ok' if not problems else 'FALLO: ' + '; '.join(problems)}")
+            failures += bool(problems)
+
+    if failures:
+        print(f"[WARNING] {failures} variantes no emiten las frases esperadas")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+"""Benchmark de la deduplicación MinHash/LSH frente a comparar todos los pares.
+
+Una parte de las filas son copias de frases anteriores con cambios de
+mayúsculas, puntuación, diacríticos, j/v y erratas, como las que aparecen al
+scrapear varias páginas. Se mide el tiempo y la precisión/cobertura
+respecto a esa verdad conocida. Uso::
+
+    python -m benchmarks.bench_dedup --rows 100000
+"""
+import argparse
+import random
+import time
+
+from latin_phrases_scraper.dedup import deduplicate, normalize_phrase, shingles
+
+from benchmarks.synthetic import synthetic_rows
+
+SYLLABLES = ['a', 'ae', 'am', 'an', 'ar', 'ca', 'ce', 'ci', 'de', 'di', 'do', 'es', 'fe', 'gra',
+             'in', 'is', 'la', 'li', 'lu', 'ma', 'me', 'mi', 'mo', 'na', 'ne', 'ni', 'no',
+             'pa', 'pe', 'po', 'qui', 'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'ta', 'te',
+             'ti', 'to', 'tu', 'um', 'us', 've', 'vi', 'vo']
+
+ACCENTS = str.maketrans({'a': 'ā', 'e': 'ē', 'i': 'ī', 'o': 'ō', 'u': 'ū'})
+
+
+def perturb(phrase, rng):
+    """Variante de ``phrase`` como las que aparecen en otras páginas."""
+    choice = rng.randrange(5)
+    if choice == 0:
+        phrase = phrase.capitalize() + rng.choice(['.', '!', ';', ' (?)'])
+    elif choice == 1:
+        words = phrase.split()
+        i = rng.randrange(len(words))
+        words[i] = words[i].translate(ACCENTS)
+        phrase = " ".join(words)
+    elif choice == 2:
+        phrase = phrase.replace('i', 'j', 1).replace('u', 'v', 1)
+    elif choice == 3:
+        phrase = phrase.replace(" ", ", ", 1).upper()
+    else:
+        # Errata de una letra: esta no desaparece al normalizar
+        i = rng.randrange(len(phrase))
+        phrase = phrase[:i] + rng.choice('aeioust') + phrase[i + 1:]
+    return phrase
+
+
+def noisy_rows(n, duplicate_ratio, seed=0):
+    """Filas sintéticas y, para cada una, el índice de la original que duplica (o None)."""
+    rng = random.Random(seed)
+    rows, truth = [], []
+    originals = []
+    # Las frases de synthetic_rows usan un vocabulario muy pequeño: aquí se
+    # forman con pseudopalabras latinas para que se parezcan a las reales
+    for row in synthetic_rows(n, seed=seed):
+        if originals and rng.random() < duplicate_ratio:
+            original = rng.choice(originals)
+            rows.append(dict(rows[original], latin_phrase=perturb(rows[original]['latin_phrase'], rng)))
+            truth.append(original)
+        else:
+            row['latin_phrase'] = " ".join(
+                "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(rng.randint(2, 6))
+            )
+            originals.append(len(rows))
+            rows.append(row)
+            truth.append(None)
+    return rows, truth
+
+
+def all_pairs_seconds(rows, threshold):
+    """Tiempo de comparar todos los pares por Jaccard exacta (cuadrático)."""
+    sets = [shingles(normalize_phrase(row['latin_phrase'])) for row in rows]
+    start = time.perf_counter()
+    for i, first in enumerate(sets):
+        for second in sets[:i]:
+            if len(first & second) >= threshold * len(first | second):
+                break
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--duplicates', type=float, default=0.2, help="fracción de filas duplicadas")
+    parser.add_argument('--pairs-sample', type=int, default=2000,
+                        help="filas para estimar el coste de comparar todos los pares")
+    args = parser.parse_args()
+
+    rows, truth = noisy_rows(args.rows, args.duplicates)
+    expected = sum(original is not None for original in truth)
+
+    for n in (args.rows // 4, args.rows // 2, args.rows):
+        start = time.perf_counter()
+        kept, report = deduplicate(rows[:n], policy='keep_all')
+        elapsed = time.perf_counter() - start
+        print(f"{n:>7} filas: {elapsed:6.2f}s  ({n / elapsed:,.0f} filas/s)")
+
+    found = {}
+    for cluster in report['clusters']:
+        for duplicate in cluster['duplicates']:
+            found[duplicate['latin_phrase']] = cluster['representative']
+    true_positives = sum(
+        1 for row, original in zip(rows, truth)
+        if original is not None and found.get(row['latin_phrase']) == rows[original]['latin_phrase']
+    )
+    print(f"duplicados: {expected} reales, {report['duplicates']} detectados en "
+          f"{len(report['clusters'])} grupos")
+    print(f"precisión {true_positives / max(report['duplicates'], 1):.3f}  "
+          f"cobertura {true_positives / max(expected, 1):.3f}")
+
+    sample = args.pairs_sample
+    seconds = all_pairs_seconds(rows[:sample], 0.8)
+    estimate = seconds * (args.rows / sample) ** 2
+    print(f"todos los pares: {seconds:.2f}s con {sample} filas -> ~{estimate / 60:.0f} min estimados "
+          f"para {args.rows}")
+
+
+if __name__ == '__main__':
+    main()
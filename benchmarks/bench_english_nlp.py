@@ -0,0 +1,56 @@
+"""Benchmark del análisis en inglés con spaCy.
+
+Compara el Doc único de antes con ``nlp.pipe`` por lotes y sin componentes
+innecesarios. Uso::
+
+    python -m benchmarks.bench_english_nlp --rows 1000 10000 100000 --n-process 1 4
+"""
+import argparse
+import time
+from collections import Counter
+
+from latin_phrases_scraper.analysis import UNUSED_SPACY_COMPONENTS, analyze_english
+from latin_phrases_scraper.models import load_spacy_en
+
+from benchmarks.synthetic import synthetic_rows
+
+
+def single_doc(nlp, texts):
+    """Implementación anterior: un solo Doc con todas las traducciones unidas."""
+    doc = nlp(" ".join(texts))
+    tokens = [t for t in doc if t.is_alpha and not t.is_stop]
+    words = Counter(t.lemma_.lower() for t in tokens).most_common(20)
+    verbs = Counter(t.lemma_.lower() for t in tokens if t.pos_ == "VERB").most_common(10)
+    return words, verbs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--n-process', type=int, nargs='+', default=[1])
+    args = parser.parse_args()
+
+    nlp_full = load_spacy_en()
+    nlp_pruned = load_spacy_en(exclude=UNUSED_SPACY_COMPONENTS)
+
+    for n in args.rows:
+        texts = [row['translation'] for row in synthetic_rows(n)]
+        total_chars = sum(len(t) + 1 for t in texts)
+        if total_chars < nlp_full.max_length:
+            start = time.perf_counter()
+            single_doc(nlp_full, texts)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>7} filas  doc único            {n / elapsed:>10.0f} docs/s")
+        else:
+            print(f"{n:>7} filas  doc único            supera nlp.max_length ({total_chars} caracteres)")
+
+        for n_process in args.n_process:
+            start = time.perf_counter()
+            analyze_english(nlp_pruned, texts, batch_size=args.batch_size, n_process=n_process)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>7} filas  nlp.pipe n_process={n_process:<2} {n / elapsed:>10.0f} docs/s")
+
+
+if __name__ == '__main__':
+    main()
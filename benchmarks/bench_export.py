@@ -0,0 +1,62 @@
+"""Benchmark de la exportación: to_excel de una vez frente a los exportadores por bloques.
+
+Cada caso se ejecuta en un proceso nuevo para que el RSS pico medido sea
+solo el suyo. Uso::
+
+    python -m benchmarks.bench_export --rows 10000 100000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from latin_phrases_scraper.exporters import EXPORTERS, open_exporter
+from latin_phrases_scraper.models import peak_rss_mb
+
+from benchmarks.synthetic import synthetic_rows
+
+
+def iter_rows(n):
+    # Las filas se generan por bloques para no medir una lista completa en memoria
+    block = 10000
+    for start in range(0, n, block):
+        yield from synthetic_rows(min(block, n - start), seed=start)
+
+
+def run_case(export_format, n, directory):
+    """Devuelve (segundos, MB de RSS pico añadidos, tamaño del fichero en MB)."""
+    import pandas as pd  # noqa: F401  (se importa antes de medir la memoria base)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    if export_format == 'xlsx (anterior)':
+        path = os.path.join(directory, 'rows.xlsx')
+        pd.DataFrame(list(iter_rows(n))).to_excel(path, index=False)
+    else:
+        path = os.path.join(directory, f'rows.{export_format}')
+        exporter = open_exporter(export_format, path)
+        for row in iter_rows(n):
+            exporter.write(row)
+        exporter.close()
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mb() - baseline, os.path.getsize(path) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--formats', nargs='+', default=['xlsx (anterior)'] + list(EXPORTERS))
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        for n in args.rows:
+            for export_format in args.formats:
+                with context.Pool(1) as pool:
+                    elapsed, rss, size = pool.apply(run_case, (export_format, n, directory))
+                print(f"{n:>7} filas  {export_format:<16} {elapsed:>7.2f}s  "
+                      f"+{rss:>6.0f} MB RSS  {size:>7.1f} MB en disco")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark del análisis por campos: traducción sola, campos por separado y pasada compartida.
+
+Compara la pasada de spaCy de siempre (solo ``translation``) con analizar
+también ``notes`` en pasadas independientes y con ``MultiFieldAnalyzer``
+(una pasada por idioma con los textos distintos de todos los campos). Usa el
+sustituto de spaCy de ``benchmarks.stubs`` salvo con ``--real-models``. Uso::
+
+    python -m benchmarks.bench_fields --rows 10000 50000
+    python -m benchmarks.bench_fields --rows 10000 --real-models
+"""
+import argparse
+import time
+
+from latin_phrases_scraper.analysis import UNUSED_SPACY_COMPONENTS, IncrementalAnalyzer
+from latin_phrases_scraper.models import ModelRegistry, load_spacy_en
+from latin_phrases_scraper.multilingual import MultiFieldAnalyzer
+from latin_phrases_scraper.store import PhraseStore
+
+from benchmarks.stubs import StubNlp
+from benchmarks.synthetic import synthetic_rows
+
+
+class CountingNlp:
+    """Envuelve un ``nlp`` y cuenta los textos que pasan por el modelo."""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.texts = 0
+
+    def pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.texts += len(texts)
+        return self.nlp.pipe(texts, **kwargs)
+
+
+def translation_only(nlp, store, batch_size):
+    analyzer = IncrementalAnalyzer(lambda: nlp, batch_size=batch_size)
+    for translation in store.column('translation'):
+        analyzer.add(None, translation)
+    return analyzer.english_results()
+
+
+def separate_passes(nlp, store, batch_size):
+    results = []
+    for field in ('translation', 'notes'):
+        analyzer = IncrementalAnalyzer(lambda: nlp, batch_size=batch_size)
+        for text in store.column(field):
+            analyzer.add(None, text)
+        results.append(analyzer.english_results())
+    return results
+
+
+def shared_pass(nlp, store, batch_size):
+    models = ModelRegistry()
+    analyzer = MultiFieldAnalyzer(models, batch_size=batch_size)
+    models.register('nlp_en', lambda: nlp)
+    analyzer.add_columns(store.columns)
+    return analyzer.results()
+
+
+MODES = [
+    ("traducción (actual)", translation_only),
+    ("campos por separado", separate_passes),
+    ("pasada compartida", shared_pass),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3, help="repeticiones (se usa la más rápida)")
+    parser.add_argument('--real-models', action='store_true', help="usa en_core_web_sm en lugar del sustituto")
+    args = parser.parse_args()
+
+    if args.real_models:
+        start = time.perf_counter()
+        nlp = load_spacy_en(exclude=UNUSED_SPACY_COMPONENTS)
+        print(f"Modelo cargado en {time.perf_counter() - start:.2f}s (una vez por idioma)")
+    else:
+        nlp = StubNlp()
+
+    for n in args.rows:
+        store = PhraseStore()
+        for row in synthetic_rows(n):
+            store.append(row)
+        baseline = None
+        for name, function in MODES:
+            elapsed = float('inf')
+            for _ in range(args.repeat):
+                counting = CountingNlp(nlp)
+                start = time.perf_counter()
+                function(counting, store, args.batch_size)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            baseline = baseline or elapsed
+            print(f"{n:>7} filas  {name:<22} {elapsed:>7.2f}s  {counting.texts:>8} textos al modelo  "
+                  f"x{elapsed / baseline:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark de la generación de frases en español.
+
+Compara el bucle anterior (una llamada al modelo por frase) con una sola
+llamada con ``num_return_sequences=N``, para cada backend. Uso::
+
+    python -m benchmarks.bench_generation --phrases 5 --backends torch onnx onnx-int8
+"""
+import argparse
+import time
+
+from latin_phrases_scraper.generation import GENERATION_PARAMS, build_prompt, generate_batch
+from latin_phrases_scraper.models import GENERATION_BACKENDS, load_spanish_generator
+
+PROMPT = build_prompt(['veritas', 'vincit', 'omnia'], ['ser', 'tener'])
+
+
+def per_call_loop(generator, n):
+    """Implementación anterior: ``n`` decodificaciones independientes."""
+    texts = []
+    for _ in range(n):
+        output = generator(PROMPT, num_return_sequences=1, **GENERATION_PARAMS)
+        texts.append(output[0]['generated_text'])
+    return texts
+
+
+def batched(generator, n):
+    outputs = generator(PROMPT, num_return_sequences=n, **GENERATION_PARAMS)
+    return [output['generated_text'] for output in outputs]
+
+
+def generated_tokens(generator, texts):
+    prompt_tokens = len(generator.tokenizer(PROMPT)['input_ids'])
+    return sum(len(generator.tokenizer(text)['input_ids']) - prompt_tokens for text in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--phrases', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', choices=GENERATION_BACKENDS, default=['torch'])
+    args = parser.parse_args()
+
+    for backend in args.backends:
+        start = time.perf_counter()
+        generator = load_spanish_generator(backend=backend)
+        print(f"{backend}: carga {time.perf_counter() - start:.2f}s")
+        # Una llamada de calentamiento para no medir inicializaciones perezosas
+        generate_batch(generator, PROMPT, 1, seed=0)
+
+        for name, run in (('bucle por frase', per_call_loop), ('lote único', batched)):
+            best, tokens = None, 0
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                texts = run(generator, args.phrases)
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best:
+                    best, tokens = elapsed, generated_tokens(generator, texts)
+            print(f"  {name:<16} {best:>6.2f}s  {tokens / best:>7.1f} tokens/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark del índice de frases: construcción, tamaño y latencia de consulta.
+
+Compara la búsqueda en el índice mapeado en memoria con el recorrido
+completo de las filas que hacía falta antes. Uso::
+
+    python -m benchmarks.bench_index --rows 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from latin_phrases_scraper.index import PhraseIndex, build_index, normalize, tokenize
+
+from benchmarks.synthetic import synthetic_rows
+
+QUERIES = ['veritas', 'truth', 'memento mori']
+PREFIXES = ['carpe', 'ad', 'tempus fugit']
+
+
+def per_call_us(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def scan_search(rows, query):
+    terms = set(tokenize(query))
+    return [i for i, row in enumerate(rows)
+            if terms <= set(tokenize(row['latin_phrase'])) | set(tokenize(row['translation']))]
+
+
+def scan_prefix(rows, prefix):
+    key = normalize(prefix)
+    return [i for i, row in enumerate(rows) if normalize(row['latin_phrase']).startswith(key)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'phrases.idx')
+        info = build_index(rows, path)
+        print(f"construcción: {info['build_s']:.2f}s  tamaño: {info['bytes'] / (1024 * 1024):.1f} MB  "
+              f"({info['bytes'] / args.rows:.0f} bytes/frase, {info['terms']} términos)")
+
+        start = time.perf_counter()
+        index = PhraseIndex.open(path)
+        print(f"apertura (mmap): {(time.perf_counter() - start) * 1e6:.0f} µs")
+
+        for query in QUERIES:
+            assert index.search(*query.split()) == scan_search(rows, query)
+            indexed = per_call_us(lambda: index.search(*query.split()), args.repeat)
+            scanned = per_call_us(lambda: scan_search(rows, query), 1)
+            print(f"términos {query!r:<16} {len(index.search(*query.split())):>7} filas  "
+                  f"índice {indexed:>9.1f} µs  recorrido {scanned:>11.0f} µs")
+        for prefix in PREFIXES:
+            assert sorted(index.prefix(prefix)) == scan_prefix(rows, prefix)
+            indexed = per_call_us(lambda: index.prefix(prefix, limit=20), args.repeat)
+            scanned = per_call_us(lambda: scan_prefix(rows, prefix), 1)
+            print(f"prefijo  {prefix!r:<16} {len(index.prefix(prefix)):>7} filas  "
+                  f"índice {indexed:>9.1f} µs  recorrido {scanned:>11.0f} µs")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
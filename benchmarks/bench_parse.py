@@ -0,0 +1,81 @@
+"""Benchmark de ``WikipediaLatinSpider.parse``.
+
+Compara la extracción anterior (un Selector por fila y celda) con la
+extracción en una pasada sobre el árbol lxml. Usa copias guardadas de la
+página completa o, si no se indican, una página sintética. Uso::
+
+    python -m benchmarks.bench_parse --html List_of_Latin_phrases_full.html
+    python -m benchmarks.bench_parse --rows 5000 --repeat 5
+"""
+import argparse
+import time
+
+from scrapy.http import HtmlResponse
+
+from latin_phrases_scraper.spiders.wikipedia_spider import extract_rows
+
+from benchmarks.synthetic import synthetic_wikitable_html
+
+URL = "https://en.wikipedia.org/wiki/List_of_Latin_phrases_(full)"
+
+
+def legacy_parse(response):
+    """Extracción anterior, con un Selector por tabla, fila y celda."""
+    for table in response.css('table.wikitable'):
+        for row in table.css('tr')[1:]:
+            cells = row.css('td')
+            if len(cells) >= 2:
+                yield {
+                    'latin_phrase': cells[0].css('::text').get("").strip(),
+                    'translation': cells[1].css('::text').get("").strip(),
+                    'notes': " ".join([cell.css('::text').get("") for cell in cells[2:]]).strip(),
+                }
+
+
+def fast_parse(response):
+    """Extracción en una pasada que usa ``WikipediaLatinSpider.parse``."""
+    for latin_phrase, translation, notes in extract_rows(response.selector.root):
+        yield {'latin_phrase': latin_phrase, 'translation': translation, 'notes': notes}
+
+
+def measure(parse, body, repeat):
+    """Devuelve (filas/s, filas) con el mejor tiempo de ``repeat`` ejecuciones."""
+    best = None
+    for _ in range(repeat):
+        # Respuesta nueva en cada vuelta: el parseo del HTML cuenta en el tiempo
+        response = HtmlResponse(URL, body=body, encoding='utf-8')
+        start = time.perf_counter()
+        rows = list(parse(response))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--html', nargs='*', default=[], help="copias guardadas de la página")
+    parser.add_argument('--rows', type=int, default=5000, help="filas de la página sintética")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [(path, open(path, 'rb').read()) for path in args.html]
+    if not pages:
+        pages = [(f"sintética ({args.rows} filas)", synthetic_wikitable_html(args.rows).encode('utf-8'))]
+
+    for name, body in pages:
+        legacy_speed, legacy_rows = measure(legacy_parse, body, args.repeat)
+        fast_speed, fast_rows = measure(fast_parse, body, args.repeat)
+        # Filas en las que la extracción nueva recupera más texto que la anterior
+        longer = sum(
+            len(new['latin_phrase']) > len(old['latin_phrase'])
+            or len(new['translation']) > len(old['translation'])
+            for old, new in zip(legacy_rows, fast_rows)
+        )
+        print(f"{name}")
+        print(f"  anterior: {legacy_speed:>10.0f} filas/s ({len(legacy_rows)} filas)")
+        print(f"  nueva:    {fast_speed:>10.0f} filas/s ({len(fast_rows)} filas)")
+        print(f"  speedup:  {fast_speed / legacy_speed:.1f}x, filas con texto más completo: {longer}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark de la crawl completa reproducida desde un archivo grabado (sin red).
+
+Primero se graba una crawl con ``REPLAY_MODE=record`` (contra Wikipedia o,
+con ``--record-local``, contra el servidor local sintético) y después se
+reproduce varias veces con ``REPLAY_MODE=replay`` midiendo ítems/s. Uso::
+
+    scrapy crawl wikipedia_latin -s REPLAY_MODE=record -s REPLAY_ARCHIVE=replay/crawl.warc
+    python -m benchmarks.bench_replay --archive replay/crawl.warc --repeat 3
+    python -m benchmarks.bench_replay --record-local --archive replay/local.warc
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.local_site import LocalSite, build_pages
+
+
+def crawl(extra_args, pipelines=True):
+    """Ejecuta ``scrapy crawl`` y devuelve (segundos, ítems)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'items.jsonl')
+        command = [
+            sys.executable, '-m', 'scrapy', 'crawl', 'wikipedia_latin',
+            '-O', output, '-s', 'LOG_LEVEL=WARNING',
+            '-s', f'RUN_REPORT_PATH={os.path.join(tmp, "run_report.json")}',
+            '-s', f'PAGE_CACHE_PATH={os.path.join(tmp, "pages.sqlite3")}',
+        ] + extra_args
+        if not pipelines:
+            command += ['-s', 'ITEM_PIPELINES={}']
+        start = time.perf_counter()
+        subprocess.run(command, check=True)
+        elapsed = time.perf_counter() - start
+        with open(output, encoding='utf-8') as f:
+            items = sum(1 for _ in f)
+    return elapsed, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--archive', default='replay/crawl.warc')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--record-local', action='store_true',
+                        help="graba antes una crawl del servidor local sintético")
+    parser.add_argument('--rows-per-letter', type=int, default=200)
+    parser.add_argument('--no-pipeline', action='store_true',
+                        help="mide solo crawl y parseo, sin LatinPhrasesPipeline")
+    args = parser.parse_args()
+    archive = ['-s', f'REPLAY_ARCHIVE={args.archive}']
+
+    start_url = []
+    if args.record_local:
+        with LocalSite(build_pages(rows_per_letter=args.rows_per_letter)) as site:
+            start_url = ['-a', f'start_url={site.start_url}']
+            elapsed, items = crawl(start_url + archive + ['-s', 'REPLAY_MODE=record'], pipelines=False)
+            print(f"grabación  {elapsed:>7.2f}s  {items} ítems")
+
+    for run in range(1, args.repeat + 1):
+        elapsed, items = crawl(start_url + archive + ['-s', 'REPLAY_MODE=replay'],
+                               pipelines=not args.no_pipeline)
+        print(f"replay #{run}  {elapsed:>7.2f}s  {items} ítems  {items / elapsed:>8.0f} ítems/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark de las frases relacionadas: TF-IDF y top-k de todos los pares.
+
+Compara el cálculo por lotes (matriz dispersa por bloques densos y
+``argpartition``) con un bucle en Python que ordena los vecinos fila a fila
+(sobre una muestra, extrapolado al total). Uso::
+
+    python -m benchmarks.bench_similarity --rows 50000
+"""
+import argparse
+import heapq
+import os
+import tempfile
+import time
+
+from latin_phrases_scraper.similarity import RelatedPhrases, build_similarity, tfidf_matrix
+
+from benchmarks.synthetic import synthetic_rows
+
+
+def loop_top_k(X, rows, k):
+    """Top-k por fila con un producto escalar por par, como se haría sin vectorizar."""
+    vectors = [dict(zip(X.indices[X.indptr[i]:X.indptr[i + 1]], X.data[X.indptr[i]:X.indptr[i + 1]]))
+               for i in range(X.shape[0])]
+    for i in rows:
+        first = vectors[i]
+        scores = (
+            (sum(weight * second.get(term, 0.0) for term, weight in first.items()), j)
+            for j, second in enumerate(vectors) if j != i
+        )
+        heapq.nlargest(k, scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--loop-sample', type=int, default=20, help="filas para estimar el bucle en Python")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'phrases.similarity.npz')
+        info = build_similarity(rows, path, args.k, args.batch_size)
+        print(f"{info['rows']} filas, {info['terms']} términos: TF-IDF {info['tfidf_s']:.2f}s, "
+              f"top-{info['k']} de todos los pares {info['top_k_s']:.2f}s "
+              f"({info['rows'] / info['top_k_s']:,.0f} filas/s), {info['bytes'] / (1024 * 1024):.1f} MB")
+
+        start = time.perf_counter()
+        related = RelatedPhrases.open(path)
+        loaded = time.perf_counter()
+        for row_id in range(1000):
+            related.related_to_row(row_id)
+        lookup = (time.perf_counter() - loaded) / 1000
+        print(f"carga {(loaded - start) * 1e3:.0f} ms, consulta {lookup * 1e6:.0f} µs por frase")
+
+    X, _, _, _ = tfidf_matrix(rows)
+    start = time.perf_counter()
+    loop_top_k(X, range(args.loop_sample), args.k)
+    per_row = (time.perf_counter() - start) / args.loop_sample
+    print(f"bucle en Python: {per_row * 1e3:.0f} ms por fila -> ~{per_row * args.rows / 60:.0f} min "
+          f"estimados para {args.rows} filas")
+
+
+if __name__ == '__main__':
+    main()
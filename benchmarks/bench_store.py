@@ -0,0 +1,60 @@
+"""Benchmark de memoria por frase: lista de dicts frente a ``PhraseStore``.
+
+Las filas se generan y se descartan una a una (como los ítems de la crawl),
+de modo que solo se mide lo que retiene cada almacén. Uso::
+
+    python -m benchmarks.bench_store --rows 100000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from latin_phrases_scraper.store import PhraseStore
+
+from benchmarks.synthetic import synthetic_rows
+
+
+def measure(build, n):
+    """Bytes retenidos por la estructura que devuelve ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    structure = build(n)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, structure
+
+
+def iter_rows(n):
+    block = 10000
+    for start in range(0, n, block):
+        # Cada bloque se libera cuando se termina de recorrer
+        yield from synthetic_rows(min(block, n - start), seed=start)
+
+
+def build_list(n):
+    return [dict(row) for row in iter_rows(n)]
+
+
+def build_store(n):
+    store = PhraseStore()
+    for row in iter_rows(n):
+        store.append(row)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, build in (('lista de dicts', build_list), ('PhraseStore', build_store)):
+        size, _ = measure(build, args.rows)
+        results[name] = size
+        print(f"{name:<15} {size / (1024 * 1024):>8.1f} MB  {size / args.rows:>7.1f} bytes/frase")
+    print(f"reducción: {results['lista de dicts'] / results['PhraseStore']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
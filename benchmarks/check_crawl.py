@@ -0,0 +1,116 @@
+"""Comprobación de la crawl real (``scrapy crawl``) contra el servidor local sintético.
+
+Ejecuta el spider con la configuración del proyecto (middlewares, caché de
+páginas, concurrencia adaptativa), sin los pipelines de análisis, y comprueba:
+
+1. primera crawl: cada página se pide una vez y cada frase se emite una vez;
+2. recrawl sin cambios: las mismas frases, reutilizadas desde la caché;
+3. recrawl con una subpágina modificada que repite frases de ``(full)``: las
+   frases nuevas aparecen y ninguna se emite dos veces;
+4. recrawl con otra versión del extractor: ninguna página reutiliza sus
+   filas guardadas.
+
+Sale con código 1 si alguna comprobación falla. Uso::
+
+    python -m benchmarks.check_crawl --rows-per-letter 50
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from latin_phrases_scraper.spiders.wikipedia_spider import row_key
+
+from benchmarks.local_site import LocalSite, build_pages, expected_phrases
+from benchmarks.synthetic import synthetic_wikitable_html
+
+# Subpágina que se modifica en la tercera crawl (comparte sus filas con (full))
+CHANGED_PATH = "/wiki/List_of_Latin_phrases_(A)"
+
+
+def run_crawl(start_url, tmp, name, extra_args=()):
+    """Ejecuta la crawl y devuelve ``(código de salida, ítems, stats)``."""
+    output = os.path.join(tmp, f"{name}.jsonl")
+    report = os.path.join(tmp, f"{name}.json")
+    command = [
+        sys.executable, '-m', 'scrapy', 'crawl', 'wikipedia_latin',
+        '-a', f'start_url={start_url}',
+        '-O', output,
+        '-s', 'ITEM_PIPELINES={}',
+        '-s', 'ROBOTSTXT_OBEY=False',
+        '-s', 'LOG_LEVEL=WARNING',
+        '-s', f'PAGE_CACHE_PATH={os.path.join(tmp, "pages.sqlite3")}',
+        '-s', f'RUN_REPORT_PATH={report}',
+        *extra_args,
+    ]
+    returncode = subprocess.run(command).returncode
+    items, stats = [], {}
+    if os.path.exists(output):
+        with open(output, encoding='utf-8') as f:
+            items = [json.loads(line) for line in f]
+    if os.path.exists(report):
+        with open(report, encoding='utf-8') as f:
+            stats = json.load(f)
+    return returncode, items, stats
+
+
+def check_crawl(name, site, tmp, pages, reused, extra_args=()):
+    """Lanza una crawl y devuelve la lista de fallos encontrados."""
+    site.requests.clear()
+    returncode, items, stats = run_crawl(site.start_url, tmp, name, extra_args)
+    expected = expected_phrases(pages)
+    keys = [row_key(item['latin_phrase'], item.get('translation')) for item in items]
+    failures = []
+    if returncode:
+        failures.append(f"scrapy crawl terminó con código {returncode}")
+    if len(keys) != len(set(keys)):
+        failures.append(f"{len(keys) - len(set(keys))} frases emitidas más de una vez")
+    if set(keys) != expected:
+        failures.append(f"{len(expected - set(keys))} frases esperadas no emitidas, "
+                        f"{len(set(keys) - expected)} inesperadas")
+    requested = {path for path in site.requests if path in pages}
+    if requested != set(pages):
+        failures.append(f"páginas seguidas: {len(requested)} de {len(pages)}")
+    if any(site.requests[path] > 1 for path in pages):
+        failures.append("alguna página se pidió más de una vez")
+    pages_reused = stats.get('page_cache/pages_reused', 0)
+    if pages_reused != reused:
+        failures.append(f"páginas reutilizadas de la caché: {pages_reused} (esperadas {reused})")
+
+    status = "ok" if not failures else "FALLO"
+    print(f"{name:<18} {len(items):>6} ítems  {len(requested):>3} páginas  "
+          f"{pages_reused:>3} reutilizadas  {status}")
+    for failure in failures:
+        print(f"  - {failure}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows-per-letter', type=int, default=50)
+    args = parser.parse_args()
+
+    pages = build_pages(rows_per_letter=args.rows_per_letter)
+    failures = []
+    with LocalSite(pages) as site, tempfile.TemporaryDirectory() as tmp:
+        failures += check_crawl("primera crawl", site, tmp, pages, reused=0)
+        failures += check_crawl("sin cambios", site, tmp, pages, reused=len(pages))
+
+        # Mismas filas que (full) y algunas nuevas al final
+        pages[CHANGED_PATH] = synthetic_wikitable_html(args.rows_per_letter + 10, seed=0)
+        site.pages[CHANGED_PATH] = pages[CHANGED_PATH].encode('utf-8')
+        failures += check_crawl("una página nueva", site, tmp, pages, reused=len(pages) - 1)
+        failures += check_crawl("otro extractor", site, tmp, pages, reused=0,
+                                extra_args=['-a', 'extractor_version=check'])
+
+    if failures:
+        print(f"[WARNING] {len(failures)} comprobaciones fallidas")
+        return 1
+    print("[SUCCESS] La crawl completa funciona contra el servidor local")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
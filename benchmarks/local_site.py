@@ -0,0 +1,111 @@
+"""Servidor HTTP local que imita las páginas de frases latinas de Wikipedia.
+
+Sirve ``/wiki/List_of_Latin_phrases_(full)`` con enlaces a una subpágina por
+letra, todas generadas de forma sintética, con una latencia configurable.
+Uso::
+
+    python -m benchmarks.local_site --port 8000 --rows-per-letter 200 --latency 0.3
+"""
+import argparse
+import string
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from benchmarks.synthetic import synthetic_wikitable_html
+
+FULL_PATH = "/wiki/List_of_Latin_phrases_(full)"
+
+
+def build_pages(letters=string.ascii_uppercase[:20], rows_per_letter=200):
+    """Devuelve un dict ruta -> HTML con la página (full) y las subpáginas por letra."""
+    pages = {}
+    links = []
+    for i, letter in enumerate(letters):
+        path = f"/wiki/List_of_Latin_phrases_({letter})"
+        links.append(f'<a href="{path}">{letter}</a>')
+        pages[path] = synthetic_wikitable_html(rows_per_letter, seed=i)
+    # La página completa enlaza a las letras y repite las filas de la primera,
+    # como en Wikipedia, donde (full) y las subpáginas se solapan
+    full = synthetic_wikitable_html(rows_per_letter, seed=0)
+    pages[FULL_PATH] = full.replace('<body>', '<body><p>' + " ".join(links) + '</p>', 1)
+    return pages
+
+
+def expected_phrases(pages):
+    """Filas (con la clave ``row_key`` del spider) que una crawl completa debe emitir una vez."""
+    import lxml.html
+    from latin_phrases_scraper.spiders.wikipedia_spider import extract_rows, row_key
+    keys = set()
+    for html in pages.values():
+        for latin_phrase, translation, _ in extract_rows(lxml.html.fromstring(html)):
+            keys.add(row_key(latin_phrase, translation))
+    return keys
+
+
+class LocalSite:
+    """Servidor en un hilo aparte; se usa como context manager.
+
+    ``requests`` cuenta las peticiones recibidas por ruta y ``pages`` puede
+    modificarse entre crawls para simular cambios en una página.
+    """
+
+    def __init__(self, pages, port=0, latency=0.0):
+        self.pages = {path: html.encode('utf-8') for path, html in pages.items()}
+        self.latency = latency
+        self.requests = Counter()
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(site.latency)
+                path = unquote(self.path)
+                site.requests[path] += 1
+                body = site.pages.get(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def start_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}{FULL_PATH}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rows-per-letter', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.3)
+    args = parser.parse_args()
+    with LocalSite(build_pages(rows_per_letter=args.rows_per_letter), args.port, args.latency) as site:
+        print(f"Sirviendo {site.start_url} (Ctrl+C para terminar)")
+        try:
+            site.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
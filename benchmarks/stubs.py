@@ -0,0 +1,48 @@
+"""Sustitutos ligeros de spaCy y del generador para medir el pipeline sin modelos.
+
+Imitan solo la parte de la interfaz que usa el pipeline (``nlp.pipe`` con
+tokens que tienen ``is_alpha``, ``is_stop``, ``lemma_`` y ``pos_``, y un
+generador al estilo ``transformers.pipeline``). Su coste es pequeño y
+estable, así que las mediciones reflejan el código del proyecto.
+"""
+import re
+
+STOPWORDS = frozenset("a an and are as at be by for from if in is it of on or that the to will with you".split())
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+
+# Terminaciones que el sustituto etiqueta como verbo
+VERB_ENDINGS = ('s', 'ed', 'ing', 'ize', 'ise')
+
+
+class StubToken:
+    __slots__ = ('text', 'is_alpha', 'is_stop', 'lemma_', 'pos_')
+
+    def __init__(self, text):
+        lower = text.lower()
+        self.text = text
+        self.is_alpha = text.isalpha()
+        self.is_stop = lower in STOPWORDS
+        self.lemma_ = lower
+        self.pos_ = 'VERB' if lower.endswith(VERB_ENDINGS) else 'NOUN'
+
+
+class StubNlp:
+    """``nlp`` con tokenización por expresión regular y POS por terminaciones."""
+
+    def __call__(self, text):
+        return [StubToken(word) for word in WORD_RE.findall(text)]
+
+    def pipe(self, texts, batch_size=1000, n_process=1):
+        for text in texts:
+            yield self(text)
+
+
+class StubGenerator:
+    """Generador que devuelve frases fijas con el formato de ``transformers.pipeline``."""
+
+    def __call__(self, prompt, num_return_sequences=1, **params):
+        return [
+            {'generated_text': f"{prompt} Frase de prueba número {i + 1}. Texto sobrante"}
+            for i in range(num_return_sequences)
+        ]
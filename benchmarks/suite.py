@@ -0,0 +1,245 @@
+"""Suite de rendimiento offline: spider, pipeline y generación de principio a fin.
+
+Genera páginas sintéticas con tablas ``table.wikitable``, las pasa por
+``WikipediaLatinSpider.parse`` como ``HtmlResponse`` y envía los ítems a
+``LatinPhrasesPipeline.process_item``/``close_spider`` con sustitutos de spaCy
+y del generador (``--real-models`` usa los modelos instalados). Informa de
+filas/s, tiempos por etapa y memoria pico, y compara con una línea base
+guardada: sale con código 1 si alguna métrica empeora más que la tolerancia.
+Uso::
+
+    python -m benchmarks.suite --save-baseline          # guarda benchmarks/baseline.json
+    python -m benchmarks.suite                          # compara con la línea base
+    python -m benchmarks.suite --pages 4 --rows 20000 --repeat 3 --tolerance 0.1
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+from scrapy.exceptions import DropItem
+from scrapy.http import HtmlResponse, Request
+
+from latin_phrases_scraper.models import peak_rss_mb
+from latin_phrases_scraper.pipelines import LatinPhrasesPipeline, NearDuplicatePipeline
+from latin_phrases_scraper.profiling import StageProfiler, timed_iter
+from latin_phrases_scraper.spiders.wikipedia_spider import WikipediaLatinSpider
+
+from benchmarks.stubs import StubGenerator, StubNlp
+from benchmarks.synthetic import synthetic_wikitable_html
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+URL = "https://en.wikipedia.org/wiki/List_of_Latin_phrases_({})"
+
+# Diferencias absolutas por debajo de este tiempo se consideran ruido
+MIN_SECONDS = 0.005
+
+
+def build_responses(pages, rows, tables, seed):
+    """Una ``HtmlResponse`` por página, con ``rows`` filas repartidas entre todas."""
+    per_page = -(-rows // pages)
+    return [
+        HtmlResponse(
+            URL.format(chr(ord('A') + page)),
+            body=synthetic_wikitable_html(per_page, tables, seed=seed + page).encode('utf-8'),
+            encoding='utf-8',
+        )
+        for page in range(pages)
+    ]
+
+
+def build_pipelines(tmp, args):
+    pipeline = LatinPhrasesPipeline(
+        warmup=False,
+        export_format='jsonl',
+        export_path=os.path.join(tmp, 'latin_phrases_analysis.jsonl'),
+        excel_path=None,
+        report_json_path=os.path.join(tmp, 'analisis_frecuencias.json'),
+        index_path=os.path.join(tmp, 'latin_phrases.idx'),
+        similarity_top_k=args.similarity_top_k,
+        incremental=args.incremental,
+        analysis_fields=args.fields,
+    )
+    if not args.real_models:
+        pipeline.models.register('nlp_en', StubNlp)
+        pipeline.models.register('generator', StubGenerator)
+    chain = [pipeline]
+    if args.dedup:
+        chain.insert(0, NearDuplicatePipeline())
+    return chain, pipeline
+
+
+def run_once(args):
+    """Ejecuta spider + pipelines una vez y devuelve ``(métricas, etapas)``."""
+    profiler = StageProfiler()
+    spider = WikipediaLatinSpider(follow_letters=False)
+
+    with profiler.stage('html'):
+        responses = build_responses(args.pages, args.rows, args.tables, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.chdir(tmp), \
+            contextlib.redirect_stdout(io.StringIO()):
+        chain, pipeline = build_pipelines(tmp, args)
+        pipeline.open_spider(spider)
+
+        items = []
+        for response in responses:
+            # Solo el tiempo dentro de parse (la respuesta se parsea aquí)
+            items.extend(result for result in timed_iter(spider.parse(response), profiler, 'parse')
+                         if not isinstance(result, Request))
+
+        kept = 0
+        with profiler.stage('process_item'):
+            for item in items:
+                try:
+                    for stage in chain:
+                        item = stage.process_item(item, spider)
+                except DropItem:
+                    continue
+                kept += 1
+
+        with profiler.stage('close_spider'):
+            for stage in chain:
+                stage.close_spider(spider)
+
+    stages = profiler.report()
+    parse_s = stages['parse']['wall_s']
+    process_s = stages['process_item']['wall_s']
+    close_s = stages['close_spider']['wall_s']
+    total_s = parse_s + process_s + close_s
+    metrics = {
+        'items': len(items),
+        'items_kept': kept,
+        'parse_rows_per_s': len(items) / parse_s if parse_s else 0.0,
+        'process_items_per_s': len(items) / process_s if process_s else 0.0,
+        'end_to_end_rows_per_s': len(items) / total_s if total_s else 0.0,
+        'parse_s': parse_s,
+        'process_item_s': process_s,
+        'close_spider_s': close_s,
+        'total_s': total_s,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    # Etapas internas del pipeline (export, latin_counting, english_nlp, ...)
+    pipeline_stages = {name: entry for name, entry in pipeline.profiler.report().items() if name != 'metrics'}
+    return metrics, pipeline_stages
+
+
+def run(args):
+    """Repite la medición ``args.repeat`` veces y se queda con el mejor valor de cada métrica."""
+    runs = [run_once(args) for _ in range(args.repeat)]
+    metrics = {}
+    for name in runs[0][0]:
+        values = [run_metrics[name] for run_metrics, _ in runs]
+        metrics[name] = max(values) if name.endswith('_per_s') else min(values)
+    stages = {}
+    for _, run_stages in runs:
+        for name, entry in run_stages.items():
+            if name not in stages or entry['wall_s'] < stages[name]['wall_s']:
+                stages[name] = entry
+    return {
+        'config': {
+            'pages': args.pages, 'rows': args.rows, 'tables': args.tables, 'seed': args.seed,
+            'dedup': args.dedup, 'incremental': args.incremental, 'fields': args.fields,
+            'similarity_top_k': args.similarity_top_k, 'real_models': args.real_models,
+        },
+        'python': sys.version.split()[0],
+        'metrics': metrics,
+        'stages': {name: {'wall_s': entry['wall_s'], 'cpu_s': entry['cpu_s'], 'calls': entry['calls']}
+                   for name, entry in stages.items()},
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Devuelve filas ``(nombre, base, actual, cambio, regresión)`` para el informe."""
+    rows = []
+
+    def check(name, old, new, higher_is_better):
+        if old is None or new is None:
+            return
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        regression = worse > tolerance
+        if not higher_is_better and name != 'peak_rss_mb' and abs(new - old) < MIN_SECONDS:
+            regression = False
+        rows.append((name, old, new, change, regression))
+
+    for name, new in results['metrics'].items():
+        if name in ('items', 'items_kept'):
+            continue
+        check(name, baseline['metrics'].get(name), new, higher_is_better=name.endswith('_per_s'))
+    for name, entry in results['stages'].items():
+        old = baseline['stages'].get(name)
+        check(f"stage/{name}", old['wall_s'] if old else None, entry['wall_s'], higher_is_better=False)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=20000, help="filas en total, repartidas entre las páginas")
+    parser.add_argument('--tables', type=int, default=5, help="tablas por página")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="repeticiones (se usa la más rápida)")
+    parser.add_argument('--dedup', action='store_true', help="incluye NearDuplicatePipeline")
+    parser.add_argument('--incremental', action='store_true', help="análisis incremental en process_item")
+    parser.add_argument('--fields', nargs='*', default=[],
+                        help="análisis por campo e idioma, p. ej. translation:en notes:en")
+    parser.add_argument('--similarity-top-k', type=int, default=0, help="frases relacionadas (requiere SciPy)")
+    parser.add_argument('--real-models', action='store_true', help="usa spaCy y el generador reales")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help="guarda los resultados como línea base")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="empeoramiento relativo permitido (el ruido entre ejecuciones ronda el 10%%)")
+    parser.add_argument('--output', help="guarda también los resultados en este JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    metrics = results['metrics']
+    print(f"{metrics['items']} filas ({metrics['items_kept']} tras los pipelines), "
+          f"{args.pages} páginas, mejor de {args.repeat}")
+    print(f"  parse:        {metrics['parse_rows_per_s']:>12,.0f} filas/s")
+    print(f"  process_item: {metrics['process_items_per_s']:>12,.0f} ítems/s")
+    print(f"  total:        {metrics['end_to_end_rows_per_s']:>12,.0f} filas/s ({metrics['total_s']:.2f}s)")
+    print(f"  close_spider: {metrics['close_spider_s']:>12.3f} s")
+    print(f"  RSS pico:     {metrics['peak_rss_mb']:>12.0f} MB")
+    for name, entry in sorted(results['stages'].items(), key=lambda item: -item[1]['wall_s']):
+        print(f"    {name:<16} {entry['wall_s']:>8.3f}s  (CPU {entry['cpu_s']:.3f}s, {entry['calls']} llamadas)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"[SUCCESS] Línea base guardada en '{args.baseline}'")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"[INFO] No hay línea base en '{args.baseline}' (usa --save-baseline)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('config') != results['config']:
+        print(f"[WARNING] La línea base se midió con otra configuración: {baseline.get('config')}")
+        return 0
+
+    rows = compare(results, baseline, args.tolerance)
+    print(f"\nComparación con '{args.baseline}' (tolerancia {args.tolerance:.0%}):")
+    for name, old, new, change, regression in rows:
+        status = "REGRESIÓN" if regression else "ok"
+        print(f"  {name:<28} {old:>12.4g} -> {new:>12.4g}  {change:>+7.1%}  {status}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"[WARNING] {len(regressions)} métricas empeoran más de un {args.tolerance:.0%}: "
+              f"{', '.join(regressions)}")
+        return 1
+    print("[SUCCESS] Sin regresiones")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+"""Generadores de datos sintéticos para los benchmarks."""
+import random
+
+LATIN_WORDS = [
+    'veritas', 'lux', 'vitae', 'amor', 'vincit', 'omnia', 'carpe', 'diem', 'memento',
+    'mori', 'tempus', 'fugit', 'alea', 'iacta', 'bellum', 'pacem', 'para', 'cogito',
+    'ergo', 'sum', 'habeas', 'corpus', 'dominus', 'fortuna', 'audaces', 'iuvat',
+    'errare', 'humanum', 'vivere', 'militare', 'scire', 'audire', 'amavi', 'audivi',
+    'natus', 'scriptus', 'ars', 'longa', 'vita', 'brevis', 'nihil', 'novi', 'sub', 'sole',
+]
+
+ENGLISH_WORDS = [
+    'truth', 'light', 'life', 'love', 'conquers', 'all', 'seize', 'the', 'day',
+    'remember', 'that', 'you', 'will', 'die', 'time', 'flies', 'die', 'is', 'cast',
+    'if', 'want', 'peace', 'prepare', 'for', 'war', 'think', 'therefore', 'am',
+    'have', 'body', 'lord', 'fortune', 'favors', 'bold', 'to', 'err', 'human',
+    'live', 'fight', 'know', 'hear', 'born', 'written', 'art', 'long', 'short',
+    'nothing', 'new', 'under', 'sun', 'said', 'made', 'goes', 'comes', 'gave',
+]
+
+
+def synthetic_rows(n, seed=0):
+    """Devuelve ``n`` filas con la forma de ``LatinPhraseItem`` (dicts)."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        rows.append({
+            'latin_phrase': " ".join(rng.choices(LATIN_WORDS, k=rng.randint(2, 6))),
+            'translation': " ".join(rng.choices(ENGLISH_WORDS, k=rng.randint(3, 12))),
+            # Muchas notas vacías o repetidas, como en la página real
+            'notes': "" if rng.random() < 0.4 else " ".join(rng.choices(ENGLISH_WORDS, k=rng.randint(5, 25))),
+        })
+    return rows
+
+
+def synthetic_wikitable_html(n_rows, n_tables=1, seed=0):
+    """Devuelve una página HTML con tablas ``table.wikitable`` como las de Wikipedia.
+
+    Las celdas incluyen cursivas, enlaces y referencias ``<sup>`` para que la
+    extracción trabaje con el mismo tipo de marcado que la página real.
+    """
+    rows = synthetic_rows(n_rows, seed=seed)
+    per_table = max(1, -(-n_rows // n_tables))
+    parts = ['<html><head><title>List of Latin phrases</title></head><body>']
+    for start in range(0, n_rows, per_table):
+        parts.append('<table class="wikitable sortable"><tbody>')
+        parts.append('<tr><th>Latin</th><th>Translation</th><th>Notes</th></tr>')
+        for i, row in enumerate(rows[start:start + per_table], start):
+            parts.append(
+                f'<tr><td><i><a href="/wiki/Phrase_{i}">{row["latin_phrase"]}</a></i></td>'
+                f'<td>{row["translation"]}</td>'
+                f'<td>{row["notes"]}<sup class="reference"><a href="#cite-{i}">[{i % 9 + 1}]</a></sup></td></tr>'
+            )
+        parts.append('</tbody></table>')
+    parts.append('</body></html>')
+    return "\n".join(parts)
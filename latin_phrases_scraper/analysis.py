@@ -0,0 +1,186 @@
+import re
+from collections import Counter
+from contextlib import nullcontext
+
+# Palabras latinas: secuencias de 3+ letras (sobre el texto en minúsculas)
+LATIN_TOKEN_RE = re.compile(r'\b[a-z]{3,}\b')
+
+# Sufijos comunes de verbos latinos
+LATIN_VERB_SUFFIXES = ('are', 'ere', 'ire', 'avi', 'ivi', 'atus', 'itus')
+
+# Componentes de spaCy que el análisis no usa: solo necesitamos POS y lema,
+# que salen de tok2vec + tagger + attribute_ruler + lemmatizer.
+UNUSED_SPACY_COMPONENTS = ["parser", "ner", "senter"]
+
+
+class LatinCounter:
+    """Cuenta palabras latinas y detecta verbos por sufijo, clasificando cada palabra una vez.
+
+    Los tokens se cuentan con ``Counter.update`` (en C) y los textos
+    repetidos se tokenizan una sola vez. La detección de verbos se hace al
+    final, sobre el vocabulario y no sobre cada aparición, con una única
+    expresión regular precompilada que reúne todos los sufijos. El patrón de
+    tokens, los sufijos y el umbral de palabras raras son configurables.
+    """
+
+    def __init__(self, token_pattern=LATIN_TOKEN_RE.pattern, verb_suffixes=LATIN_VERB_SUFFIXES,
+                 rare_max_count=2):
+        self.token_re = re.compile(token_pattern)
+        # Sufijos más largos primero para que la alternancia no dependa del orden
+        suffixes = sorted(set(verb_suffixes), key=len, reverse=True)
+        self.verb_re = re.compile('(?:' + '|'.join(map(re.escape, suffixes)) + r')\Z') if suffixes else None
+        self.rare_max_count = rare_max_count
+        self.counts = Counter()
+
+    def add(self, text, count=1):
+        """Suma los tokens de ``text`` (``count`` veces)."""
+        tokens = self.token_re.findall(str(text).lower())
+        if count == 1:
+            self.counts.update(tokens)
+        else:
+            for token in tokens:
+                self.counts[token] += count
+
+    def add_many(self, texts):
+        """Suma una colección de textos tokenizando cada texto distinto una sola vez.
+
+        El orden de primera aparición de las palabras se conserva, así que
+        los desempates del top-N son los mismos que recorriendo fila a fila.
+        """
+        for text, count in Counter(text for text in texts if text is not None).items():
+            self.add(text, count)
+
+    def is_verb(self, word):
+        return self.verb_re is not None and self.verb_re.search(word) is not None
+
+    def results(self, stopwords, top_words=20, top_verbs=10):
+        """Devuelve ``(word_freq, verb_freq, rare_words)``.
+
+        Las palabras con ``rare_max_count`` apariciones o menos se tratan como
+        stopwords, igual que las de ``stopwords``.
+        """
+        rare_words = {word for word, count in self.counts.items() if count <= self.rare_max_count}
+        excluded = set(stopwords) | rare_words
+        words = Counter({w: c for w, c in self.counts.items() if w not in excluded})
+        verbs = Counter({w: c for w, c in words.items() if self.is_verb(w)})
+        return words.most_common(top_words), verbs.most_common(top_verbs), rare_words
+
+
+def english_lemmas(doc):
+    """Devuelve pares (lema, es_verbo) de los tokens alfabéticos que no son stopwords."""
+    return [(token.lemma_.lower(), token.pos_ == "VERB")
+            for token in doc if token.is_alpha and not token.is_stop]
+
+
+def analyze_english(nlp, texts, batch_size=1000, n_process=1, top_words=20, top_verbs=10):
+    """Cuenta lemas y verbos en inglés procesando cada traducción por separado.
+
+    En lugar de un único Doc gigante (que choca con ``nlp.max_length``), los
+    textos se pasan por ``nlp.pipe`` en lotes y, opcionalmente, en varios
+    procesos. Devuelve ``(english_word_freq, english_verb_freq)``.
+    """
+    words = Counter()
+    verbs = Counter()
+    texts = (str(text) for text in texts if text)
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        for lemma, is_verb in english_lemmas(doc):
+            words[lemma] += 1
+            if is_verb:
+                verbs[lemma] += 1
+    return words.most_common(top_words), verbs.most_common(top_verbs)
+
+
+class IncrementalAnalyzer:
+    """Mantiene contadores de frecuencias que se actualizan ítem a ítem.
+
+    La memoria depende del vocabulario, no del número de ítems: cada frase
+    latina se tokeniza al llegar y las traducciones se acumulan solo hasta
+    completar un lote de ``nlp.pipe``. Al final basta con calcular los top-N.
+    """
+
+    def __init__(self, nlp_getter, batch_size=1000, n_process=1, flush_size=None, cache=None,
+                 profiler=None, latin_counter=None):
+        # nlp_getter es una función para no forzar la carga de spaCy hasta
+        # que haya un lote completo que procesar
+        self.nlp_getter = nlp_getter
+        self.batch_size = batch_size
+        self.n_process = n_process
+        # Con varios procesos conviene acumular más textos por llamada a
+        # nlp.pipe, porque cada llamada arranca sus procesos de trabajo
+        self.flush_size = flush_size or batch_size
+        # NlpCache opcional: las filas ya analizadas en crawls anteriores no
+        # vuelven a pasar por el modelo
+        self.cache = cache
+        # StageProfiler opcional para medir tokenización latina y pasadas de spaCy
+        self.profiler = profiler
+        self.latin = latin_counter or LatinCounter()
+        self.english_words = Counter()
+        self.english_verbs = Counter()
+        self._pending = []
+
+    def add(self, latin_phrase, translation):
+        """Actualiza los contadores con una fila."""
+        if latin_phrase is not None:
+            with self._stage('latin_tokenize'):
+                self.latin.add(latin_phrase)
+        if translation:
+            self._pending.append(str(translation))
+            if len(self._pending) >= self.flush_size:
+                self.flush()
+
+    def add_latin_many(self, latin_phrases):
+        """Cuenta de una vez una colección de frases latinas (modo por lotes)."""
+        with self._stage('latin_tokenize'):
+            self.latin.add_many(latin_phrases)
+
+    def add_translations(self, translations):
+        """Analiza de una vez una colección de traducciones (modo por lotes).
+
+        Todas las que no están en la caché pasan por una sola llamada a
+        ``nlp.pipe``: con ``n_process > 1`` cada llamada arranca sus procesos
+        de trabajo, así que no se trocea en lotes de ``flush_size``.
+        """
+        self._pending.extend(str(translation) for translation in translations if translation)
+        self.flush()
+
+    def flush(self):
+        """Procesa con spaCy las traducciones pendientes."""
+        if not self._pending:
+            return
+        with self._stage('english_nlp'):
+            self._flush()
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        known = self.cache.get_many(pending) if self.cache is not None else {}
+
+        # Solo los textos nuevos (y una vez cada uno) pasan por spaCy; si todo
+        # está en caché, el modelo ni siquiera se carga
+        missing = list(dict.fromkeys(text for text in pending if text not in known))
+        if missing:
+            docs = self.nlp_getter().pipe(missing, batch_size=self.batch_size, n_process=self.n_process)
+            analyzed = {text: english_lemmas(doc) for text, doc in zip(missing, docs)}
+            if self.cache is not None:
+                self.cache.put_many(analyzed)
+            known.update(analyzed)
+
+        for text in pending:
+            for lemma, is_verb in known[text]:
+                self.english_words[lemma] += 1
+                if is_verb:
+                    self.english_verbs[lemma] += 1
+
+    def _stage(self, name):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def latin_results(self, stopwords, top_words=20, top_verbs=10):
+        """Devuelve ``(latin_word_freq, latin_verb_freq, rare_words)``.
+
+        Como antes, las palabras con 1-2 apariciones se tratan como stopwords.
+        """
+        return self.latin.results(stopwords, top_words, top_verbs)
+
+    def english_results(self, top_words=20, top_verbs=10):
+        """Devuelve ``(english_word_freq, english_verb_freq)``."""
+        self.flush()
+        return self.english_words.most_common(top_words), self.english_verbs.most_common(top_verbs)
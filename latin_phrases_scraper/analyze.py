@@ -0,0 +1,78 @@
+"""Vuelve a ejecutar el análisis de frecuencias sobre un dataset ya exportado.
+
+Lee el fichero fila a fila (JSONL, CSV, Parquet o xlsx) a un ``PhraseStore``
+y usa las mismas etapas que ``LatinPhrasesPipeline.close_spider`` en modo por
+lotes, sin volver a scrapear.
+Uso::
+
+    python -m latin_phrases_scraper.analyze latin_phrases_analysis.jsonl
+    python -m latin_phrases_scraper.analyze datos.parquet --stages latin english --n-process 4
+    python -m latin_phrases_scraper.analyze datos.jsonl --fields translation:en notes:en latin_phrase:la
+"""
+import argparse
+
+from latin_phrases_scraper.exporters import iter_export
+from latin_phrases_scraper.pipelines import ANALYSIS_STAGES, LatinPhrasesPipeline
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m latin_phrases_scraper.analyze",
+        description="Análisis de frecuencias y generación de frases a partir de un dataset exportado.",
+    )
+    parser.add_argument('dataset', help="fichero exportado (.jsonl, .csv, .parquet o .xlsx)")
+    parser.add_argument('--format', dest='export_format', choices=['jsonl', 'csv', 'parquet', 'xlsx'],
+                        help="formato del fichero (por defecto se deduce de la extensión)")
+    parser.add_argument('--stages', nargs='+', choices=ANALYSIS_STAGES, default=list(ANALYSIS_STAGES),
+                        help="etapas a ejecutar (por defecto todas)")
+    parser.add_argument('--output', default="analisis_frecuencias.txt", help="informe de texto")
+    parser.add_argument('--json', dest='json_path', default="analisis_frecuencias.json",
+                        help="informe JSON legible por máquina")
+    parser.add_argument('--batch-size', type=int, default=1000, help="tamaño de lote de nlp.pipe")
+    parser.add_argument('--n-process', type=int, default=1, help="procesos para el análisis con spaCy")
+    parser.add_argument('--fields', nargs='*', default=[],
+                        help="campos a analizar por idioma, como campo:idioma (p. ej. notes:en)")
+    parser.add_argument('--stopwords', nargs='*', default=[],
+                        help="stopwords latinas adicionales")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Mismo pipeline que en la crawl, en modo por lotes y sin exportación: las
+    # filas se guardan en su PhraseStore y cada modelo de spaCy analiza todos
+    # los textos en una sola llamada a nlp.pipe (con --n-process, cada llamada
+    # arranca sus procesos de trabajo)
+    pipeline = LatinPhrasesPipeline(
+        warmup=False, nlp_batch_size=args.batch_size, nlp_n_process=args.n_process,
+        incremental=False, excel_path=None, analysis_fields=args.fields,
+    )
+    pipeline.latin_stopwords.update(args.stopwords)
+
+    for row in iter_export(args.dataset, args.export_format):
+        pipeline.item_count += 1
+        pipeline.phrases.append(row)
+
+    print(f"[INFO] Se leyeron {pipeline.item_count} frases de '{args.dataset}'.")
+    if not pipeline.item_count:
+        print("[WARNING] El dataset está vacío.")
+        return 1
+
+    phrases = pipeline.phrases
+    if 'latin' in args.stages:
+        pipeline.analyzer.add_latin_many(phrases.column('latin_phrase'))
+    if pipeline.fields is not None and (
+            'fields' in args.stages or ('english' in args.stages and pipeline.fields_cover_english)):
+        pipeline.fields.add_columns(phrases.columns)
+    translations = None
+    if 'english' in args.stages and not pipeline.fields_cover_english:
+        translations = phrases.column('translation')
+
+    results = pipeline.run_analysis(stages=args.stages, translations=translations)
+    pipeline.write_reports(results, text_path=args.output, json_path=args.json_path)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,112 @@
+import mmap
+import os
+from datetime import datetime, timezone
+
+# Cabeceras que no se guardan: el cuerpo se archiva ya descomprimido y con su
+# longitud real, así que estas dejarían de ser ciertas al reproducirlo
+SKIPPED_HEADERS = {b'content-encoding', b'content-length', b'transfer-encoding'}
+
+
+class ArchiveWriter:
+    """Escribe respuestas HTTP en un único fichero con registros estilo WARC.
+
+    Cada registro es un bloque de cabeceras ``WARC/1.0`` seguido de la
+    respuesta HTTP completa (línea de estado, cabeceras y cuerpo), cuya
+    longitud indica ``Content-Length``.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'wb')
+
+    def write_response(self, url, status, headers, body):
+        """Añade un registro. ``headers`` es una lista de pares (nombre, valor) en bytes."""
+        http_headers = b"".join(
+            name + b": " + value + b"\r\n"
+            for name, value in headers if name.lower() not in SKIPPED_HEADERS
+        )
+        payload = (
+            b"HTTP/1.1 " + str(status).encode('ascii') + b"\r\n"
+            + http_headers
+            + b"Content-Length: " + str(len(body)).encode('ascii') + b"\r\n\r\n"
+            + body
+        )
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        record_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {date}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        ).encode('utf-8')
+        self.file.write(record_headers + payload + b"\r\n\r\n")
+
+    def close(self):
+        self.file.close()
+
+
+class ArchiveReader:
+    """Lee un archivo escrito por ``ArchiveWriter`` mediante mmap.
+
+    Al abrirlo recorre solo las cabeceras de cada registro (salta los cuerpos
+    con ``Content-Length``) para construir un índice URL -> posición. Las
+    respuestas se leen después directamente del mapa de memoria.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.index = self._build_index()
+
+    def _build_index(self):
+        index = {}
+        data = self.map
+        position = 0
+        while True:
+            start = data.find(b"WARC/1.0\r\n", position)
+            if start < 0:
+                break
+            headers_end = data.find(b"\r\n\r\n", start)
+            fields = _parse_fields(data[start:headers_end].split(b"\r\n")[1:])
+            payload_start = headers_end + 4
+            length = int(fields[b'content-length'])
+            # Si la URL se grabó varias veces, gana el último registro
+            index[fields[b'warc-target-uri'].decode('utf-8')] = (payload_start, length)
+            position = payload_start + length
+        return index
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, url):
+        """Devuelve ``(status, headers, body)`` de la URL, o None si no está archivada."""
+        location = self.index.get(url)
+        if location is None:
+            return None
+        start, length = location
+        headers_end = self.map.find(b"\r\n\r\n", start, start + length)
+        lines = self.map[start:headers_end].split(b"\r\n")
+        status = int(lines[0].split(b" ", 2)[1])
+        headers = [tuple(line.split(b": ", 1)) for line in lines[1:]]
+        body = self.map[headers_end + 4:start + length]
+        return status, headers, body
+
+    def close(self):
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+
+def _parse_fields(lines):
+    fields = {}
+    for line in lines:
+        name, _, value = line.partition(b":")
+        fields[name.strip().lower()] = value.strip()
+    return fields
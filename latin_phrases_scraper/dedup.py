@@ -0,0 +1,245 @@
+"""Detección de frases casi duplicadas con firmas MinHash y LSH por bandas.
+
+Cada frase latina se normaliza (minúsculas, sin diacríticos ni puntuación,
+j/v -> i/u) y se trocea en 3-gramas de caracteres. La firma MinHash estima
+la similitud de Jaccard entre frases y el LSH solo compara cada frase con
+las que comparten alguna banda de la firma, así que el coste crece de forma
+aproximadamente lineal con el número de filas. Uso sobre un dataset exportado::
+
+    python -m latin_phrases_scraper.dedup latin_phrases_analysis.jsonl --policy merge \\
+        --output latin_phrases_dedup.jsonl --report duplicados.json
+"""
+import argparse
+import hashlib
+import json
+import operator
+import os
+import re
+import time
+from array import array
+
+from latin_phrases_scraper.index import normalize
+from latin_phrases_scraper.store import StringColumn
+
+# Políticas: keep_first descarta los duplicados, keep_all los conserva y solo
+# los informa, merge fusiona notas y traducciones en la primera aparición
+# (merge solo en lote: en la crawl los ítems ya se han exportado al llegar)
+POLICIES = ('keep_first', 'keep_all', 'merge')
+ONLINE_POLICIES = ('keep_first', 'keep_all')
+
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+# Variantes ortográficas habituales del latín (Alea jacta est / Alea iacta est)
+LATIN_SPELLING = str.maketrans({'j': 'i', 'v': 'u'})
+
+SHINGLE_SIZE = 3
+
+# Cada resumen blake2b de 64 bytes aporta 32 valores de 16 bits (una "permutación" cada uno)
+_VALUES_PER_DIGEST = 32
+
+
+def normalize_phrase(text):
+    """Forma canónica de una frase para compararla con otras."""
+    text = NON_WORD_RE.sub(" ", normalize(text or "")).strip()
+    return text.translate(LATIN_SPELLING)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """3-gramas de caracteres (con un espacio delante y detrás) de una frase normalizada."""
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class MinHasher:
+    """Firmas MinHash de ``num_perm`` valores de 16 bits.
+
+    Las "permutaciones" salen de blake2b por shingle (un resumen de 64 bytes
+    por cada 32 valores), memorizado como tupla: el vocabulario de 3-gramas
+    es pequeño y se repite mucho, así que casi todo el trabajo por frase es
+    el mínimo columna a columna.
+    """
+
+    def __init__(self, num_perm=64):
+        self.num_perm = num_perm
+        self.n_digests = -(-num_perm // _VALUES_PER_DIGEST)
+        self._hashes = {}
+
+    def _hash(self, shingle):
+        values = self._hashes.get(shingle)
+        if values is None:
+            raw = shingle.encode('utf-8')
+            digest = b"".join(
+                hashlib.blake2b(raw, digest_size=64, salt=i.to_bytes(16, 'little')).digest()
+                for i in range(self.n_digests)
+            )
+            values = self._hashes[shingle] = tuple(array('H', digest)[:self.num_perm])
+        return values
+
+    def signature(self, text):
+        return array('H', map(min, zip(*map(self._hash, shingles(text)))))
+
+
+def similarity(first, second):
+    """Jaccard estimada: fracción de posiciones iguales entre dos firmas."""
+    return sum(map(operator.eq, first, second)) / len(first)
+
+
+class NearDuplicateIndex:
+    """Índice LSH en línea: cada frase se compara solo con candidatas de sus bandas.
+
+    Solo se indexan los representantes (la primera frase de cada grupo), de
+    forma que un grupo no se desplaza por encadenamiento de frases parecidas.
+    Con ``bands`` bandas de ``num_perm / bands`` valores, la probabilidad de
+    ser candidatas crece en forma de S alrededor de ``(1/bands)**(bands/num_perm)``;
+    ``threshold`` filtra después las candidatas por similitud estimada.
+    """
+
+    def __init__(self, num_perm=64, bands=16, threshold=0.8):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) debe ser múltiplo de bands ({bands})")
+        self.hasher = MinHasher(num_perm)
+        self.rows_per_band = num_perm // bands
+        self.threshold = threshold
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.phrases = StringColumn()
+        self.clusters = {}
+
+    def add(self, phrase):
+        """Añade una frase y devuelve ``(id, id_representante, similitud)``.
+
+        ``id_representante`` es None si la frase no duplica a ninguna anterior.
+        Las frases vacías o solo de puntuación no se indexan: todas se
+        normalizan a "" y acabarían en un mismo grupo.
+        """
+        row_id = len(self.phrases)
+        self.phrases.append(phrase)
+        text = normalize_phrase(phrase)
+        if not text:
+            return row_id, None, 1.0
+        signature = self.hasher.signature(text)
+        keys = [
+            signature[i * self.rows_per_band:(i + 1) * self.rows_per_band].tobytes()
+            for i in range(len(self.buckets))
+        ]
+
+        best, best_similarity = None, 0.0
+        seen = set()
+        for bucket, key in zip(self.buckets, keys):
+            for candidate in bucket.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                score = similarity(signature, self.signatures[candidate])
+                if score > best_similarity:
+                    best, best_similarity = candidate, score
+        if best is not None and best_similarity >= self.threshold:
+            self.clusters.setdefault(best, []).append((row_id, best_similarity))
+            return row_id, best, best_similarity
+
+        self.signatures[row_id] = signature
+        for bucket, key in zip(self.buckets, keys):
+            bucket.setdefault(key, []).append(row_id)
+        return row_id, None, 1.0
+
+    def report(self):
+        """Grupos con duplicados, de mayor a menor: representante y frases fusionadas."""
+        clusters = [
+            {
+                'representative': self.phrases[representative],
+                'size': len(members) + 1,
+                'duplicates': [
+                    {'latin_phrase': self.phrases[row_id], 'similarity': round(score, 3)}
+                    for row_id, score in members
+                ],
+            }
+            for representative, members in self.clusters.items()
+        ]
+        clusters.sort(key=lambda cluster: cluster['size'], reverse=True)
+        return {
+            'phrases': len(self.phrases),
+            'duplicates': sum(len(members) for members in self.clusters.values()),
+            'clusters': clusters,
+        }
+
+
+def merge_rows(representative, duplicate):
+    """Fusiona ``duplicate`` en ``representative``: completa la traducción y une las notas."""
+    if not representative.get('translation'):
+        representative['translation'] = duplicate.get('translation')
+    notes = [note for note in (representative.get('notes'), duplicate.get('notes')) if note]
+    if len(notes) == 2 and notes[1] not in notes[0]:
+        representative['notes'] = f"{notes[0]} | {notes[1]}"
+    elif notes:
+        representative['notes'] = notes[0]
+
+
+def deduplicate(rows, policy='keep_first', num_perm=64, bands=16, threshold=0.8):
+    """Deduplica una secuencia de dicts y devuelve ``(filas, informe)``.
+
+    Con ``merge`` las filas resultantes son las mismas que con
+    ``keep_first``, pero con la información de sus duplicados incorporada.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política de deduplicación desconocida: {policy!r} "
+                         f"(opciones: {', '.join(POLICIES)})")
+    index = NearDuplicateIndex(num_perm, bands, threshold)
+    kept = {}
+    output = []
+    for row in rows:
+        row_id, representative, _ = index.add(row.get('latin_phrase'))
+        if representative is None:
+            if policy == 'merge':
+                kept[row_id] = row = dict(row)
+        elif policy == 'merge':
+            merge_rows(kept[representative], row)
+            continue
+        elif policy == 'keep_first':
+            continue
+        output.append(row)
+    return output, index.report()
+
+
+def write_report(path, report):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m latin_phrases_scraper.dedup",
+        description="Detecta y elimina o fusiona frases casi duplicadas de un dataset exportado.",
+    )
+    parser.add_argument('dataset', help="fichero exportado (.jsonl, .csv, .parquet o .xlsx)")
+    parser.add_argument('--policy', choices=POLICIES, default='merge')
+    parser.add_argument('--threshold', type=float, default=0.8, help="similitud de Jaccard mínima")
+    parser.add_argument('--num-perm', type=int, default=64)
+    parser.add_argument('--bands', type=int, default=16)
+    parser.add_argument('--output', default="latin_phrases_dedup.jsonl",
+                        help="dataset deduplicado (.jsonl, .csv o .parquet)")
+    parser.add_argument('--report', default="duplicados.json", help="informe JSON de los grupos")
+    args = parser.parse_args(argv)
+
+    from latin_phrases_scraper.exporters import iter_export, open_exporter
+
+    start = time.perf_counter()
+    rows, report = deduplicate(iter_export(args.dataset), args.policy, args.num_perm,
+                               args.bands, args.threshold)
+    exporter = open_exporter(os.path.splitext(args.output)[1].lstrip('.'), args.output)
+    for row in rows:
+        exporter.write(row)
+    exporter.close()
+    write_report(args.report, report)
+    print(f"[SUCCESS] {report['phrases']} frases -> {len(rows)} ({report['duplicates']} duplicados "
+          f"en {len(report['clusters'])} grupos) en {time.perf_counter() - start:.2f}s")
+    print(f"[INFO] Dataset en '{args.output}', informe en '{args.report}'")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,170 @@
+import csv
+import json
+import os
+
+# Columnas exportadas, en el orden de LatinPhraseItem
+FIELDS = ['latin_phrase', 'translation', 'notes']
+
+
+class ChunkedExporter:
+    """Exportador que acumula filas y las escribe por bloques de ``chunk_size``.
+
+    Las subclases solo implementan ``_open``, ``_write_chunk`` y ``_close``.
+    """
+
+    extension = None
+
+    def __init__(self, path, chunk_size=1000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self._buffer = []
+        self._open()
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_chunk(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+
+class JsonLinesExporter(ChunkedExporter):
+    """Un objeto JSON por línea."""
+
+    extension = 'jsonl'
+
+    def _open(self):
+        self.file = open(self.path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, rows):
+        self.file.write("".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows))
+
+    def _close(self):
+        self.file.close()
+
+
+class CsvExporter(ChunkedExporter):
+    """CSV con cabecera."""
+
+    extension = 'csv'
+
+    def _open(self):
+        self.file = open(self.path, 'w', encoding='utf-8', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDS, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def _write_chunk(self, rows):
+        self.writer.writerows(rows)
+
+    def _close(self):
+        self.file.close()
+
+
+class ParquetExporter(ChunkedExporter):
+    """Parquet con un row group por bloque (requiere pyarrow)."""
+
+    extension = 'parquet'
+
+    def _open(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        self.schema = pa.schema([(field, pa.string()) for field in FIELDS])
+        self.writer = pq.ParquetWriter(self.path, self.schema, compression='snappy')
+
+    def _write_chunk(self, rows):
+        columns = {field: [row.get(field) for row in rows] for field in FIELDS}
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def _close(self):
+        self.writer.close()
+
+
+EXPORTERS = {
+    'jsonl': JsonLinesExporter,
+    'csv': CsvExporter,
+    'parquet': ParquetExporter,
+}
+
+
+def open_exporter(export_format, path, chunk_size=1000):
+    """Crea el exportador para ``export_format`` ('jsonl', 'csv' o 'parquet')."""
+    try:
+        exporter_cls = EXPORTERS[export_format]
+    except KeyError:
+        raise ValueError(f"Formato de exportación desconocido: {export_format!r} "
+                         f"(opciones: {', '.join(EXPORTERS)})")
+    return exporter_cls(path, chunk_size)
+
+
+def read_export(path, export_format=None):
+    """Carga en un DataFrame un fichero exportado (el formato se deduce de la extensión)."""
+    import pandas as pd
+    export_format = export_format or os.path.splitext(path)[1].lstrip('.')
+    if export_format == 'jsonl':
+        return pd.read_json(path, lines=True, dtype=False)
+    if export_format == 'csv':
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+    if export_format == 'parquet':
+        return pd.read_parquet(path)
+    if export_format == 'xlsx':
+        return pd.read_excel(path, dtype=str, keep_default_na=False)
+    raise ValueError(f"Formato de exportación desconocido: {export_format!r}")
+
+
+def iter_export(path, export_format=None, chunk_size=1000):
+    """Recorre fila a fila (como dicts) un fichero exportado sin cargarlo entero."""
+    export_format = export_format or os.path.splitext(path)[1].lstrip('.')
+    if export_format == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif export_format == 'csv':
+        with open(path, encoding='utf-8', newline='') as f:
+            yield from csv.DictReader(f)
+    elif export_format == 'parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield from batch.to_pylist()
+    elif export_format == 'xlsx':
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        for values in rows:
+            yield dict(zip(header, values))
+        workbook.close()
+    else:
+        raise ValueError(f"Formato de exportación desconocido: {export_format!r}")
+
+
+def convert_to_excel(path, excel_path, export_format=None):
+    """Paso final opcional: convierte el fichero exportado a Excel."""
+    read_export(path, export_format).to_excel(excel_path, index=False)
+
+
+def phrases_to_excel(phrases, excel_path):
+    """Escribe a Excel un ``PhraseStore`` en memoria, sin releer el fichero exportado."""
+    phrases.to_pandas().to_excel(excel_path, index=False)
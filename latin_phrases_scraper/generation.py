@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+
+# Parámetros de muestreo del modelo generativo (los mismos de siempre)
+GENERATION_PARAMS = {
+    'max_length': 50,
+    'temperature': 0.8,
+    'do_sample': True,
+    'top_p': 0.9,
+}
+
+
+def build_prompt(latin_words, spanish_verbs):
+    """Crea el prompt para el modelo generativo."""
+    prompt_words = ", ".join(latin_words[:3])
+    prompt_verbs = ", ".join(spanish_verbs[:2])
+    return f"Genera una frase significativa en español que incluya las palabras latinas '{prompt_words}' y los verbos '{prompt_verbs}':"
+
+
+def clean_generated(raw_text, prompt):
+    """Extrae y limpia la frase generada (quita el prompt y el texto no deseado)."""
+    phrase = raw_text.replace(prompt, '').strip()
+    if ':' in phrase:
+        phrase = phrase.split(':', 1)[1].strip()
+    if '.' in phrase:
+        # Tomar solo la primera oración
+        phrase = phrase.split('.', 1)[0] + '.'
+    return phrase.capitalize()
+
+
+def generate_batch(generator, prompt, n, seed=None):
+    """Genera ``n`` frases con una sola llamada al modelo (``num_return_sequences=n``)."""
+    if seed is not None:
+        from transformers import set_seed
+        set_seed(seed)
+    outputs = generator(prompt, num_return_sequences=n, **GENERATION_PARAMS)
+    return [clean_generated(output['generated_text'], prompt) for output in outputs]
+
+
+class GenerationCache:
+    """Memoización en disco (JSON) de frases generadas.
+
+    La clave combina modelo, backend, prompt, semilla, número de frases y
+    parámetros de muestreo: con la misma semilla, una nueva ejecución
+    devuelve las mismas frases sin cargar el modelo.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    @staticmethod
+    def key(model_name, backend, prompt, seed, n):
+        raw = json.dumps([model_name, backend, prompt, seed, n, GENERATION_PARAMS], sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, phrases):
+        self.entries[key] = phrases
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,262 @@
+"""Índice invertido y de prefijos sobre las frases scrapeadas, en un fichero binario mmap.
+
+El índice asocia cada token (latín y traducción al inglés) a las filas que
+lo contienen y guarda las frases ordenadas para buscar por prefijo. Las
+consultas hacen búsqueda binaria directamente sobre el fichero mapeado en
+memoria, sin cargar el dataset. Uso::
+
+    python -m latin_phrases_scraper.index build latin_phrases_analysis.jsonl latin_phrases.idx
+    python -m latin_phrases_scraper.index query latin_phrases.idx veritas
+    python -m latin_phrases_scraper.index prefix latin_phrases.idx "ad "
+"""
+import argparse
+import mmap
+import os
+import re
+import struct
+import time
+import unicodedata
+from array import array
+
+MAGIC = b'LPIX'
+VERSION = 1
+
+# Cabecera: magic, versión, nº de filas, nº de términos y, para cada una de
+# las 9 secciones, su offset y su longitud en bytes
+SECTIONS = (
+    'term_offsets', 'term_data', 'posting_offsets', 'postings',
+    'phrase_offsets', 'phrase_data', 'phrase_rows', 'row_offsets', 'row_data',
+)
+HEADER = struct.Struct('<4sIII' + 'QQ' * len(SECTIONS))
+
+TOKEN_RE = re.compile(r"[^\W\d_]+")
+
+# Separador entre frase latina y traducción en la sección de filas
+ROW_SEPARATOR = '\x1f'
+
+
+def normalize(text):
+    """Minúsculas y sin diacríticos, para que 'Véritas' y 'veritas' coincidan."""
+    text = str(text).casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(normalize(text))
+
+
+def build_index(rows, path):
+    """Construye el índice a partir de dicts con ``latin_phrase`` y ``translation``.
+
+    Devuelve un dict con el número de filas y términos, el tamaño en bytes y
+    el tiempo de construcción.
+    """
+    start = time.perf_counter()
+    postings = {}
+    phrases = []
+    row_offsets = array('Q', [0])
+    row_data = bytearray()
+
+    row_id = -1
+    for row_id, row in enumerate(rows):
+        latin = row.get('latin_phrase') or ""
+        translation = row.get('translation') or ""
+        for token in set(tokenize(latin)) | set(tokenize(translation)):
+            postings.setdefault(token, array('I')).append(row_id)
+        phrases.append((normalize(latin).strip().encode('utf-8'), row_id))
+        row_data += f"{latin}{ROW_SEPARATOR}{translation}".encode('utf-8')
+        row_offsets.append(len(row_data))
+    n_rows = row_id + 1
+
+    # Términos ordenados por sus bytes UTF-8: el mismo orden que usa la búsqueda binaria
+    terms = sorted((token.encode('utf-8'), ids) for token, ids in postings.items())
+    term_offsets, term_data = array('Q', [0]), bytearray()
+    posting_offsets, posting_data = array('Q', [0]), array('I')
+    for term, ids in terms:
+        term_data += term
+        term_offsets.append(len(term_data))
+        posting_data.extend(ids)
+        posting_offsets.append(len(posting_data))
+
+    phrases.sort()
+    phrase_offsets, phrase_data, phrase_rows = array('Q', [0]), bytearray(), array('I')
+    for phrase, row in phrases:
+        phrase_data += phrase
+        phrase_offsets.append(len(phrase_data))
+        phrase_rows.append(row)
+
+    sections = [
+        term_offsets.tobytes(), bytes(term_data), posting_offsets.tobytes(), posting_data.tobytes(),
+        phrase_offsets.tobytes(), bytes(phrase_data), phrase_rows.tobytes(),
+        row_offsets.tobytes(), bytes(row_data),
+    ]
+    layout, position = [], HEADER.size
+    for section in sections:
+        # Alineamos cada sección a 8 bytes para poder leerla con memoryview.cast
+        position += -position % 8
+        layout.extend((position, len(section)))
+        position += len(section)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, n_rows, len(terms), *layout))
+        for (offset, _), section in zip(zip(layout[::2], layout[1::2]), sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+
+    return {
+        'rows': n_rows,
+        'terms': len(terms),
+        'bytes': os.path.getsize(path),
+        'build_s': time.perf_counter() - start,
+    }
+
+
+class PhraseIndex:
+    """Lectura del índice sobre un mmap; las secciones numéricas son vistas sin copia."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = HEADER.unpack_from(self.map, 0)
+        magic, version, self.n_rows, self.n_terms = header[:4]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' no es un índice de frases válido (versión {VERSION})")
+        view = memoryview(self.map)
+        sections = {}
+        for name, offset, length in zip(SECTIONS, header[4::2], header[5::2]):
+            sections[name] = view[offset:offset + length]
+        self.term_offsets = sections['term_offsets'].cast('Q')
+        self.term_data = sections['term_data']
+        self.posting_offsets = sections['posting_offsets'].cast('Q')
+        self.postings = sections['postings'].cast('I')
+        self.phrase_offsets = sections['phrase_offsets'].cast('Q')
+        self.phrase_data = sections['phrase_data']
+        self.phrase_rows = sections['phrase_rows'].cast('I')
+        self.row_offsets = sections['row_offsets'].cast('Q')
+        self.row_data = sections['row_data']
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def _term(self, i):
+        return bytes(self.term_data[self.term_offsets[i]:self.term_offsets[i + 1]])
+
+    def _phrase(self, i):
+        return bytes(self.phrase_data[self.phrase_offsets[i]:self.phrase_offsets[i + 1]])
+
+    @staticmethod
+    def _lower_bound(get, n, key):
+        low, high = 0, n
+        while low < high:
+            middle = (low + high) // 2
+            if get(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _postings(self, token):
+        """Vista (sin copia) de la lista de filas de un token ya normalizado."""
+        key = token.encode('utf-8')
+        i = self._lower_bound(self._term, self.n_terms, key)
+        if i == self.n_terms or self._term(i) != key:
+            return self.postings[0:0]
+        return self.postings[self.posting_offsets[i]:self.posting_offsets[i + 1]]
+
+    def rows_with(self, term):
+        """IDs de las filas que contienen ``term`` (latín o inglés)."""
+        return self.search(term)
+
+    def search(self, *terms):
+        """IDs (ordenados) de las filas que contienen todos los términos."""
+        tokens = {token for term in terms for token in tokenize(term)}
+        if not tokens:
+            return []
+        # Se empieza por la lista más corta y se filtra con las demás
+        postings = sorted((self._postings(token) for token in tokens), key=len)
+        if len(postings) == 1:
+            return postings[0].tolist()
+        result = set(postings[0].tolist())
+        for other in postings[1:]:
+            if not result:
+                break
+            result.intersection_update(other.tolist())
+        return sorted(result)
+
+    def prefix(self, prefix, limit=None):
+        """IDs de las filas cuya frase latina empieza por ``prefix``, en orden alfabético."""
+        key = normalize(prefix).encode('utf-8')
+        n = len(self.phrase_rows)
+        i = self._lower_bound(self._phrase, n, key)
+        rows = []
+        while i < n and self._phrase(i).startswith(key):
+            rows.append(self.phrase_rows[i])
+            if limit is not None and len(rows) >= limit:
+                break
+            i += 1
+        return rows
+
+    def row(self, row_id):
+        """Devuelve ``(latin_phrase, translation)`` de la fila."""
+        raw = bytes(self.row_data[self.row_offsets[row_id]:self.row_offsets[row_id + 1]])
+        latin, _, translation = raw.decode('utf-8').partition(ROW_SEPARATOR)
+        return latin, translation
+
+    def close(self):
+        for name in ('term_offsets', 'posting_offsets', 'postings', 'phrase_offsets',
+                     'phrase_rows', 'row_offsets', 'term_data', 'phrase_data', 'row_data'):
+            getattr(self, name).release()
+        self.map.close()
+        self.file.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m latin_phrases_scraper.index",
+        description="Construye y consulta el índice de frases latinas.",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="construye el índice desde un dataset exportado")
+    build.add_argument('dataset')
+    build.add_argument('index')
+    query = commands.add_parser('query', help="frases que contienen todos los términos")
+    query.add_argument('index')
+    query.add_argument('terms', nargs='+')
+    prefix = commands.add_parser('prefix', help="frases que empiezan por un prefijo")
+    prefix.add_argument('index')
+    prefix.add_argument('prefix')
+    for command in (query, prefix):
+        command.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from latin_phrases_scraper.exporters import iter_export
+        info = build_index(iter_export(args.dataset), args.index)
+        print(f"[SUCCESS] Índice '{args.index}': {info['rows']} filas, {info['terms']} términos, "
+              f"{info['bytes'] / 1024:.0f} KB en {info['build_s']:.2f}s")
+        return 0
+
+    index = PhraseIndex.open(args.index)
+    start = time.perf_counter()
+    if args.command == 'query':
+        rows = index.search(*args.terms)
+    else:
+        rows = index.prefix(args.prefix, limit=args.limit)
+    elapsed = time.perf_counter() - start
+    for row_id in rows[:args.limit]:
+        latin, translation = index.row(row_id)
+        print(f"{row_id:>7}  {latin} — {translation}")
+    print(f"[INFO] {len(rows)} resultados en {elapsed * 1e6:.0f} µs")
+    index.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
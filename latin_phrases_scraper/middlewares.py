@@ -3,22 +3,69 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import scrapy
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse
+from scrapy.http.headers import Headers
+from scrapy.responsetypes import responsetypes
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from latin_phrases_scraper.archive import ArchiveReader, ArchiveWriter
+from latin_phrases_scraper.pagecache import PageStore, content_hash
+from latin_phrases_scraper.profiling import StageProfiler, timed_aiter, timed_iter, write_run_report
+
+# Flag que el downloader middleware añade a las respuestas cuyo contenido no
+# cambió desde la última crawl (304 o mismo hash)
+PAGE_UNCHANGED_FLAG = "page_unchanged"
+
+
+def _open_page_store(crawler):
+    """Devuelve el PageStore de la crawl (compartido entre middlewares) o None.
+
+    Con REPLAY_MODE no hay caché de páginas: toda respuesta pasa por el parseo.
+    """
+    settings = crawler.settings
+    if not settings.getbool("PAGE_CACHE_ENABLED") or settings.get("REPLAY_MODE"):
+        return None
+    store = getattr(crawler, "page_store", None)
+    if store is None:
+        store = crawler.page_store = PageStore(settings.get("PAGE_CACHE_PATH", ".page_cache/pages.sqlite3"))
+    return store
+
+
+def _extractor_version(spider):
+    """Versión del extractor del spider como texto (None si no la declara)."""
+    version = getattr(spider, "extractor_version", None)
+    return None if version is None else str(version)
+
 
 class LatinPhrasesScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the spider middleware does not modify the
     # passed objects.
 
+    #
+    # Con PROFILING_ENABLED mide el tiempo dentro de los callbacks del spider
+    # (etapa "parse") y las filas extraídas por respuesta, y al cerrar escribe
+    # todas las stats de la crawl en RUN_REPORT_PATH.
+
+    def __init__(self, store=None, stats=None, profiler=None, report_path=None):
+        self.store = store
+        self.stats = stats
+        self.profiler = profiler
+        self.report_path = report_path
+
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        settings = crawler.settings
+        profiler = StageProfiler(crawler.stats) if settings.getbool("PROFILING_ENABLED") else None
+        s = cls(_open_page_store(crawler), crawler.stats, profiler, settings.get("RUN_REPORT_PATH"))
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_spider_input(self, response, spider):
@@ -33,8 +80,87 @@ class LatinPhrasesScraperSpiderMiddleware:
         # it has processed the response.
 
         # Must return an iterable of Request, or item objects.
+        if self.profiler is not None:
+            result = self._count_rows(timed_iter(result, self.profiler, "parse"))
+
+        if self.store is None or "page_cache" not in response.meta:
+            yield from result
+            return
+
+        entry = self._reusable_entry(response, spider)
+        if entry is not None:
+            yield from self._reuse(entry, response, spider)
+            return
+
+        links = []
         for i in result:
+            if isinstance(i, scrapy.Request):
+                links.append(i.url)
+            yield i
+        self._save(response, links, spider)
+
+    async def process_spider_output_async(self, response, result, spider):
+        # Igual que process_spider_output, para la salida asíncrona del
+        # spider (Scrapy 2.13+ exige esta variante en los middlewares síncronos)
+        if self.profiler is not None:
+            result = self._count_rows_async(timed_aiter(result, self.profiler, "parse"))
+
+        if self.store is None or "page_cache" not in response.meta:
+            async for i in result:
+                yield i
+            return
+
+        entry = self._reusable_entry(response, spider)
+        if entry is not None:
+            for i in self._reuse(entry, response, spider):
+                yield i
+            return
+
+        links = []
+        async for i in result:
+            if isinstance(i, scrapy.Request):
+                links.append(i.url)
             yield i
+        self._save(response, links, spider)
+
+    def _reusable_entry(self, response, spider):
+        """Entrada guardada de una página sin cambios y con ítems, o None.
+
+        Los ítems de otra versión del extractor (``spider.extractor_version``)
+        no se reutilizan: la página se vuelve a procesar y se guardan de nuevo.
+        """
+        if PAGE_UNCHANGED_FLAG not in response.flags:
+            return None
+        entry = self.store.get(response.url)
+        if entry is None or entry.items is None:
+            return None
+        if entry.extractor != _extractor_version(spider):
+            self.stats.inc_value("page_cache/stale_items")
+            return None
+        return entry
+
+    def _reuse(self, entry, response, spider):
+        """Reutiliza los enlaces e ítems de una página sin cambios sin llamar al callback.
+
+        Las filas se guardan antes de la deduplicación entre páginas del
+        spider, así que se vuelven a deduplicar aquí: una página modificada
+        procesada antes o después no repite frases de esta.
+        """
+        self.stats.inc_value("page_cache/pages_reused")
+        self.stats.inc_value("page_cache/items_reused", len(entry.items))
+        for url in entry.links:
+            yield scrapy.Request(url, callback=response.request.callback)
+        rows = ((item.get("latin_phrase") or "", item.get("translation") or "", item.get("notes") or "")
+                for item in entry.items)
+        yield from spider.unique_items(rows)
+
+    def _save(self, response, links, spider):
+        rows = response.meta.get("page_rows")
+        if rows is None:
+            return
+        items = [{"latin_phrase": latin_phrase, "translation": translation, "notes": notes}
+                 for latin_phrase, translation, notes in rows]
+        self.store.save_items(response.url, items, links, _extractor_version(spider))
 
     def process_spider_exception(self, response, exception, spider):
         # Called when a spider or process_spider_input() method
@@ -49,20 +175,81 @@ class LatinPhrasesScraperSpiderMiddleware:
         async for item_or_request in start:
             yield item_or_request
 
+    def _count_rows(self, result):
+        rows = 0
+        try:
+            for i in result:
+                if not isinstance(i, scrapy.Request):
+                    rows += 1
+                yield i
+        finally:
+            self._record_rows(rows)
+
+    async def _count_rows_async(self, result):
+        rows = 0
+        try:
+            async for i in result:
+                if not isinstance(i, scrapy.Request):
+                    rows += 1
+                yield i
+        finally:
+            self._record_rows(rows)
+
+    def _record_rows(self, rows):
+        self.stats.inc_value("profile/parse/responses")
+        self.stats.inc_value("profile/parse/rows", rows)
+        self.stats.max_value("profile/parse/max_rows_per_response", rows)
+
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
 
+    def spider_closed(self, spider):
+        responses = self.stats.get_value("profile/parse/responses", 0)
+        if responses:
+            rows = self.stats.get_value("profile/parse/rows", 0)
+            self.stats.set_value("profile/parse/rows_per_response", rows / responses)
+        if self.report_path:
+            write_run_report(self.report_path, self.stats.get_stats())
+            spider.logger.info("Informe de la crawl guardado en %s" % self.report_path)
+
 
 class LatinPhrasesScraperDownloaderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
     # scrapy acts as if the downloader middleware does not modify the
     # passed objects.
+    #
+    # Con PAGE_CACHE_ENABLED guarda cada página (ETag, Last-Modified, hash y
+    # cuerpo comprimido) y en las siguientes crawls envía peticiones
+    # condicionales. Las respuestas 304 se sirven desde el almacén y, junto
+    # con las que llegan con el mismo hash, se marcan como sin cambios.
+    #
+    # Con REPLAY_MODE = "record" escribe cada respuesta en REPLAY_ARCHIVE y
+    # con "replay" las sirve desde ese archivo sin tocar la red, para crawls
+    # deterministas y benchmarks offline. En ambos modos la caché de páginas
+    # se desactiva, para que toda respuesta pase por el parseo.
+
+    def __init__(self, store=None, stats=None, archive_writer=None, archive_reader=None):
+        self.store = store
+        self.stats = stats
+        self.archive_writer = archive_writer
+        self.archive_reader = archive_reader
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        settings = crawler.settings
+        mode = settings.get("REPLAY_MODE")
+        archive = settings.get("REPLAY_ARCHIVE", "replay/crawl.warc")
+        if mode == "record":
+            s = cls(stats=crawler.stats, archive_writer=ArchiveWriter(archive))
+        elif mode == "replay":
+            s = cls(stats=crawler.stats, archive_reader=ArchiveReader(archive))
+        elif mode:
+            raise ValueError(f"REPLAY_MODE desconocido: {mode!r} (usa 'record' o 'replay')")
+        else:
+            s = cls(_open_page_store(crawler), crawler.stats)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_request(self, request, spider):
@@ -75,6 +262,19 @@ class LatinPhrasesScraperDownloaderMiddleware:
         # - or return a Request object
         # - or raise IgnoreRequest: process_exception() methods of
         #   installed downloader middleware will be called
+        if self.archive_reader is not None:
+            return self._replay(request)
+
+        if self.store is None or request.method != "GET":
+            return None
+
+        request.meta["page_cache"] = True
+        entry = self.store.get(request.url)
+        if entry is not None:
+            if entry.etag:
+                request.headers.setdefault("If-None-Match", entry.etag)
+            if entry.last_modified:
+                request.headers.setdefault("If-Modified-Since", entry.last_modified)
         return None
 
     def process_response(self, request, response, spider):
@@ -84,6 +284,38 @@ class LatinPhrasesScraperDownloaderMiddleware:
         # - return a Response object
         # - return a Request object
         # - or raise IgnoreRequest
+        if self.archive_writer is not None:
+            headers = [(name, value) for name, values in response.headers.items() for value in values]
+            self.archive_writer.write_response(response.url, response.status, headers, response.body)
+            self.stats.inc_value("replay/recorded")
+
+        if self.store is None or "page_cache" not in request.meta:
+            return response
+
+        etag = _header(response, b"ETag")
+        last_modified = _header(response, b"Last-Modified")
+        entry = self.store.get(request.url)
+
+        if response.status == 304 and entry is not None:
+            self.stats.inc_value("page_cache/hit")
+            self.stats.inc_value("page_cache/not_modified")
+            self.store.update_validators(request.url, etag, last_modified)
+            headers = Headers({"Content-Type": entry.content_type or "text/html; charset=utf-8"})
+            return HtmlResponse(
+                request.url, status=200, headers=headers, body=entry.body,
+                request=request, flags=[PAGE_UNCHANGED_FLAG],
+            )
+
+        if response.status != 200:
+            return response
+
+        if entry is not None and entry.sha1 == content_hash(response.body):
+            self.stats.inc_value("page_cache/hit")
+            self.store.update_validators(request.url, etag, last_modified)
+            return response.replace(flags=response.flags + [PAGE_UNCHANGED_FLAG])
+
+        self.stats.inc_value("page_cache/miss")
+        self.store.save_page(request.url, etag, last_modified, _header(response, b"Content-Type"), response.body)
         return response
 
     def process_exception(self, request, exception, spider):
@@ -96,5 +328,112 @@ class LatinPhrasesScraperDownloaderMiddleware:
         # - return a Request object: stops process_exception() chain
         pass
 
+    def _replay(self, request):
+        """Sirve la respuesta desde el archivo grabado; sin grabación, la petición se ignora."""
+        record = self.archive_reader.get(request.url)
+        if record is None:
+            self.stats.inc_value("replay/miss")
+            raise IgnoreRequest(f"Sin respuesta grabada para {request.url}")
+        self.stats.inc_value("replay/hit")
+        status, headers, body = record
+        headers = Headers(headers)
+        respcls = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        return respcls(request.url, status=status, headers=headers, body=body,
+                       request=request, flags=["replay"])
+
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+    def spider_closed(self, spider):
+        if self.archive_writer is not None:
+            self.archive_writer.close()
+        if self.archive_reader is not None:
+            self.archive_reader.close()
+        if self.store is None:
+            return
+        hits = self.stats.get_value("page_cache/hit", 0)
+        misses = self.stats.get_value("page_cache/miss", 0)
+        if hits + misses:
+            self.stats.set_value("page_cache/hit_rate", hits / (hits + misses))
+            self.stats.set_value("page_cache/miss_rate", misses / (hits + misses))
+
+
+def _header(response, name):
+    value = response.headers.get(name)
+    return value.decode("latin-1") if value is not None else None
+
+
+class AdaptiveConcurrencyMiddleware:
+    # Ajusta la concurrencia y el retardo de cada slot de descarga según la
+    # latencia observada y los errores (AIMD): sube de uno en uno mientras las
+    # respuestas llegan por debajo de la latencia objetivo y reduce a la mitad
+    # ante un 429/503 o un error de red. Los límites mínimo y máximo mantienen
+    # la crawl educada con el servidor.
+
+    def __init__(self, crawler, min_concurrency, max_concurrency, target_latency,
+                 min_delay, max_delay, backoff_codes):
+        self.crawler = crawler
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.backoff_codes = set(backoff_codes)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool("ADAPTIVE_CONCURRENCY_ENABLED"):
+            raise NotConfigured
+        return cls(
+            crawler,
+            min_concurrency=settings.getint("ADAPTIVE_CONCURRENCY_MIN", 1),
+            max_concurrency=settings.getint("ADAPTIVE_CONCURRENCY_MAX", 8),
+            target_latency=settings.getfloat("ADAPTIVE_CONCURRENCY_TARGET_LATENCY", 1.0),
+            min_delay=settings.getfloat("ADAPTIVE_CONCURRENCY_MIN_DELAY", 0.0),
+            max_delay=settings.getfloat("ADAPTIVE_CONCURRENCY_MAX_DELAY", 30.0),
+            backoff_codes=settings.getlist("ADAPTIVE_CONCURRENCY_BACKOFF_CODES", [429, 503]),
+        )
+
+    def process_response(self, request, response, spider):
+        slot = self._get_slot(request)
+        if slot is None:
+            return response
+
+        if response.status in self.backoff_codes:
+            self._back_off(slot)
+        else:
+            latency = request.meta.get("download_latency")
+            if latency is not None:
+                self._adjust(slot, latency)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        slot = self._get_slot(request)
+        if slot is not None:
+            self._back_off(slot)
+
+    def _get_slot(self, request):
+        key = request.meta.get("download_slot")
+        return self.crawler.engine.downloader.slots.get(key)
+
+    def _adjust(self, slot, latency):
+        if latency < self.target_latency:
+            # Respuestas rápidas: una petición más en paralelo y menos espera
+            slot.concurrency = min(self.max_concurrency, slot.concurrency + 1)
+            slot.delay = max(self.min_delay, slot.delay * 0.75)
+        elif latency > 2 * self.target_latency:
+            slot.concurrency = max(self.min_concurrency, slot.concurrency - 1)
+        self._record(slot)
+
+    def _back_off(self, slot):
+        slot.concurrency = max(self.min_concurrency, slot.concurrency // 2)
+        slot.delay = min(self.max_delay, max(slot.delay * 2, 1.0))
+        self.crawler.stats.inc_value("adaptive_concurrency/backoffs")
+        self._record(slot)
+
+    def _record(self, slot):
+        stats = self.crawler.stats
+        stats.set_value("adaptive_concurrency/concurrency", slot.concurrency)
+        stats.set_value("adaptive_concurrency/delay", slot.delay)
+        stats.max_value("adaptive_concurrency/max_concurrency", slot.concurrency)
@@ -0,0 +1,155 @@
+import os
+import resource
+import sys
+import threading
+import time
+
+
+def peak_rss_mb():
+    """Devuelve la memoria residente máxima (RSS pico) del proceso en MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # En Linux ru_maxrss viene en KB, en macOS en bytes
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def load_spacy(model_name, exclude=()):
+    """Carga un modelo de spaCy (la importación también es perezosa).
+
+    ``exclude`` permite no cargar componentes que no se van a usar.
+    """
+    import spacy
+    return spacy.load(model_name, exclude=list(exclude))
+
+
+def load_spacy_en(model_name="en_core_web_sm", exclude=()):
+    """Carga el modelo de spaCy para inglés."""
+    return load_spacy(model_name, exclude)
+
+
+# Backends de generación: PyTorch en CPU, ONNX Runtime o ONNX Runtime con
+# los pesos cuantizados dinámicamente a int8
+GENERATION_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+
+def load_spanish_generator(model_name="PlanTL-GOB-ES/gpt2-base-bne", backend='torch',
+                           onnx_dir=".onnx_models"):
+    """Carga el pipeline de generación de texto en español con transformers.
+
+    Los backends ONNX (requieren ``optimum[onnxruntime]``) exportan el modelo
+    la primera vez a ``onnx_dir`` y reutilizan la exportación después.
+    """
+    from transformers import pipeline
+    if backend == 'torch':
+        return pipeline('text-generation', model=model_name, device=-1)
+    if backend not in GENERATION_BACKENDS:
+        raise ValueError(f"Backend de generación desconocido: {backend!r} "
+                         f"(opciones: {', '.join(GENERATION_BACKENDS)})")
+
+    from optimum.onnxruntime import ORTModelForCausalLM
+    from transformers import AutoTokenizer
+
+    export_dir = os.path.join(onnx_dir, model_name.replace('/', '__'))
+    if not os.path.isdir(export_dir):
+        print(f"[INFO] Exportando '{model_name}' a ONNX en '{export_dir}'...")
+        ORTModelForCausalLM.from_pretrained(model_name, export=True).save_pretrained(export_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(export_dir)
+
+    model_dir = export_dir
+    if backend == 'onnx-int8':
+        model_dir = export_dir + "-int8"
+        if not os.path.isdir(model_dir):
+            from optimum.onnxruntime import ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+            print(f"[INFO] Cuantizando '{model_name}' a int8 en '{model_dir}'...")
+            quantizer = ORTQuantizer.from_pretrained(export_dir, file_name="model.onnx")
+            quantizer.quantize(save_dir=model_dir,
+                               quantization_config=AutoQuantizationConfig.avx2(is_static=False))
+            AutoTokenizer.from_pretrained(export_dir).save_pretrained(model_dir)
+
+    file_name = "model_quantized.onnx" if backend == 'onnx-int8' else "model.onnx"
+    model = ORTModelForCausalLM.from_pretrained(model_dir, file_name=file_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    return pipeline('text-generation', model=model, tokenizer=tokenizer, device=-1)
+
+
+class ModelRegistry:
+    """Registro de modelos que se cargan la primera vez que se necesitan.
+
+    Cada modelo se registra con una función de carga. La carga ocurre una
+    sola vez (protegida por un lock) y el resultado se reutiliza. Si la carga
+    falla, el error se recuerda y se vuelve a lanzar en cada ``get``.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._errors = {}
+        self._locks = {}
+        self._threads = []
+        self.load_times = {}
+        # StageProfiler opcional: cada carga se registra como etapa "load_<nombre>"
+        self.profiler = None
+
+    def register(self, name, loader):
+        """Registra un modelo con la función que lo carga."""
+        self._loaders[name] = loader
+        self._locks[name] = threading.Lock()
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def get(self, name):
+        """Devuelve el modelo, cargándolo si todavía no está en memoria."""
+        if name in self._models:
+            return self._models[name]
+        with self._locks[name]:
+            # Otro hilo (p. ej. el warm-up) pudo cargarlo mientras esperábamos
+            if name in self._models:
+                return self._models[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            print(f"[INFO] Cargando modelo '{name}'...")
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                self._errors[name] = e
+                print(f"[WARNING] No se pudo cargar el modelo '{name}': {e}")
+                raise
+            self.load_times[name] = time.perf_counter() - start
+            if self.profiler is not None:
+                self.profiler.record(f"load_{name}", self.load_times[name], time.process_time() - cpu_start)
+            self._models[name] = model
+            print(f"[INFO] Modelo '{name}' cargado en {self.load_times[name]:.2f}s "
+                  f"(RSS pico: {peak_rss_mb():.0f} MB)")
+            return model
+
+    def available(self, name):
+        """Indica si el modelo se puede usar (intenta cargarlo si hace falta)."""
+        try:
+            self.get(name)
+        except Exception:
+            return False
+        return True
+
+    def warm_up(self, *names):
+        """Carga los modelos indicados en un hilo en segundo plano."""
+        names = names or tuple(self._loaders)
+
+        def _load_all():
+            for name in names:
+                self.available(name)
+
+        thread = threading.Thread(target=_load_all, name="model-warmup", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        return thread
+
+    def wait(self, timeout=None):
+        """Espera a que terminen los hilos de warm-up lanzados."""
+        for thread in self._threads:
+            thread.join(timeout)
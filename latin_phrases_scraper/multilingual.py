@@ -0,0 +1,248 @@
+"""Análisis de frecuencias y POS por campo e idioma en una pasada por lotes compartida.
+
+Cada campo se asocia a un idioma (``translation:en``, ``notes:en``,
+``latin_phrase:la``...) y cada idioma a un modelo de spaCy que se registra
+en el ``ModelRegistry`` como ``nlp_<idioma>``: se carga la primera vez que
+hay textos de ese idioma y sin los componentes que no se usan. Todos los
+campos de un mismo idioma comparten una sola llamada a ``nlp.pipe`` por
+lote, y cada texto distinto (aunque aparezca en varias filas o en varios
+campos) pasa por el modelo una sola vez; los contadores sí son por campo.
+"""
+import os
+from collections import Counter
+from contextlib import nullcontext
+from functools import partial
+
+from latin_phrases_scraper.analysis import UNUSED_SPACY_COMPONENTS
+from latin_phrases_scraper.models import load_spacy
+
+# Modelo de spaCy por idioma (el de latín es el de LatinCy)
+SPACY_MODELS = {
+    'en': "en_core_web_sm",
+    'es': "es_core_news_sm",
+    'la': "la_core_web_sm",
+}
+
+# Traducciones y notas en inglés
+DEFAULT_FIELDS = (('translation', 'en'), ('notes', 'en'))
+
+
+def parse_fields(specs):
+    """``["translation:en", "notes"]`` -> ``(('translation', 'en'), ('notes', 'en'))``.
+
+    Sin idioma se asume inglés; los pares repetidos se ignoran.
+    """
+    fields = []
+    for spec in specs:
+        field, _, language = str(spec).partition(':')
+        fields.append((field.strip(), language.strip() or 'en'))
+    return tuple(dict.fromkeys(fields))
+
+
+def field_key(field, language):
+    return f"{field}_{language}"
+
+
+def doc_columns(doc):
+    """Lemas, etiquetas POS y lemas de verbos de los tokens alfabéticos que no son stopwords.
+
+    Se guardan como tres listas (y no como pares) para que los contadores de
+    cada campo se actualicen con ``Counter.update``, que cuenta en C.
+    """
+    lemmas, tags, verbs = [], [], []
+    for token in doc:
+        if token.is_alpha and not token.is_stop:
+            lemma, tag = token.lemma_.lower(), token.pos_
+            lemmas.append(lemma)
+            tags.append(tag)
+            if tag == "VERB":
+                verbs.append(lemma)
+    return lemmas, tags, verbs
+
+
+class FieldCounter:
+    """Frecuencias de lemas, verbos y etiquetas POS de un campo."""
+
+    __slots__ = ('words', 'verbs', 'pos', 'texts', 'tokens')
+
+    def __init__(self):
+        self.words = Counter()
+        self.verbs = Counter()
+        self.pos = Counter()
+        self.texts = 0
+        self.tokens = 0
+
+    def add_many(self, analyzed):
+        """Suma pares ``(doc_columns, repeticiones)`` con una sola actualización por contador."""
+        lemmas, tags, verbs = [], [], []
+        for (text_lemmas, text_tags, text_verbs), count in analyzed:
+            self.texts += count
+            if count > 1:
+                text_lemmas, text_tags, text_verbs = text_lemmas * count, text_tags * count, text_verbs * count
+            lemmas += text_lemmas
+            tags += text_tags
+            verbs += text_verbs
+        self.tokens += len(lemmas)
+        self.words.update(lemmas)
+        self.pos.update(tags)
+        self.verbs.update(verbs)
+
+
+class MultiFieldAnalyzer:
+    """Analiza varios campos, cada uno con el modelo de su idioma, en lotes compartidos.
+
+    Los textos pendientes se agrupan por campo (contando repeticiones) hasta
+    reunir ``flush_size``; entonces cada idioma hace una sola pasada de
+    ``nlp.pipe`` con los textos distintos de todos sus campos. Si el modelo
+    de un idioma no está instalado, sus campos se informan como no
+    disponibles sin detener el resto del análisis.
+    """
+
+    def __init__(self, models, fields=DEFAULT_FIELDS, batch_size=1000, n_process=1, flush_size=None,
+                 profiler=None, cache_dir=None, cache_max_entries=500000, spacy_models=None):
+        self.models = models
+        self.fields = tuple(fields)
+        self.languages = tuple(dict.fromkeys(language for _, language in self.fields))
+        self.spacy_models = {**SPACY_MODELS, **(spacy_models or {})}
+        unknown = [language for language in self.languages if language not in self.spacy_models]
+        if unknown:
+            raise ValueError(f"Idiomas sin modelo de spaCy: {', '.join(unknown)} "
+                             f"(disponibles: {', '.join(self.spacy_models)})")
+        # Un modelo por idioma, sin parser/NER/senter y cargado bajo demanda
+        for language in self.languages:
+            models.register(f"nlp_{language}", partial(
+                load_spacy, self.spacy_models[language], exclude=UNUSED_SPACY_COMPONENTS))
+
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.flush_size = flush_size or batch_size
+        self.profiler = profiler
+        # Con cache_dir, una NlpCache por idioma (fields_<idioma>.sqlite3) con
+        # los lemas, POS y verbos de cada texto; se abre al usarla por primera vez
+        # y desaloja por LRU por encima de cache_max_entries
+        self.cache_dir = cache_dir
+        self.cache_max_entries = cache_max_entries
+        self.caches = {}
+        self.unavailable = set()
+        self.counters = {field_key(field, language): FieldCounter() for field, language in self.fields}
+        self._pending = {key: Counter() for key in self.counters}
+        self._pending_size = 0
+
+    def add(self, row):
+        """Añade los campos de una fila (dict o ítem)."""
+        for field, language in self.fields:
+            text = row.get(field)
+            if text:
+                self._pending[field_key(field, language)][str(text)] += 1
+                self._pending_size += 1
+        if self._pending_size >= self.flush_size:
+            self.flush()
+
+    def add_columns(self, columns):
+        """Añade de una vez columnas completas (dict campo -> iterable de textos)."""
+        for field, language in self.fields:
+            column = columns.get(field)
+            if column is None:
+                continue
+            counts = Counter(text for text in column if text)
+            self._pending[field_key(field, language)].update(counts)
+            self._pending_size += sum(counts.values())
+        self.flush()
+
+    def flush(self):
+        """Pasa los textos pendientes por el modelo de cada idioma y actualiza los contadores."""
+        if not self._pending_size:
+            return
+        pending = self._pending
+        self._pending = {key: Counter() for key in self.counters}
+        self._pending_size = 0
+        for language in self.languages:
+            keys = [field_key(field, lang) for field, lang in self.fields if lang == language]
+            texts = list(dict.fromkeys(text for key in keys for text in pending[key]))
+            if not texts or language in self.unavailable:
+                continue
+            with self._stage(f"nlp_{language}"):
+                for analyzed in self._analyze(language, texts):
+                    for key in keys:
+                        counts = pending[key]
+                        self.counters[key].add_many(
+                            (columns, counts[text]) for text, columns in analyzed.items() if text in counts)
+
+    def _analyze(self, language, texts):
+        """Genera dicts texto -> ``doc_columns`` por trozos de ``flush_size``.
+
+        Todos los textos que no están en caché pasan por una sola llamada a
+        ``nlp.pipe`` (con ``n_process > 1`` cada llamada arranca sus procesos
+        de trabajo), cuyos Docs se leen trozo a trozo: en modo por lotes
+        (``add_columns``) no se mantienen a la vez los resultados de todo el
+        corpus. Los trozos siguen el orden de ``texts`` (el de primera
+        aparición), así que los desempates del top-N no dependen de qué
+        textos estaban en caché. Si el modelo no está disponible, el idioma
+        se marca como no disponible sin generar nada ni contar aciertos o
+        fallos de la caché.
+        """
+        name = f"nlp_{language}"
+        cache = self._cache(language)
+        known = cache.get_many(texts, count=False) if cache is not None else {}
+        missing = [text for text in texts if text not in known]
+        if missing and not self.models.available(name):
+            self.unavailable.add(language)
+            return
+        if cache is not None:
+            cache.count(len(known), len(missing))
+
+        docs = iter(())
+        if missing:
+            docs = iter(self.models.get(name).pipe(missing, batch_size=self.batch_size, n_process=self.n_process))
+        for start in range(0, len(texts), self.flush_size):
+            chunk = texts[start:start + self.flush_size]
+            # ``missing`` conserva el orden de ``texts``: cada texto nuevo es el siguiente Doc
+            analyzed = {text: doc_columns(next(docs)) for text in chunk if text not in known}
+            if cache is not None and analyzed:
+                cache.put_many(analyzed)
+            yield {text: known[text] if text in known else analyzed[text] for text in chunk}
+
+    def _cache(self, language):
+        """NlpCache del idioma; si todavía no existe, solo se crea si su modelo se puede cargar."""
+        if not self.cache_dir:
+            return None
+        if language not in self.caches:
+            from latin_phrases_scraper.nlp_cache import NlpCache, spacy_model_version
+            path = os.path.join(self.cache_dir, f"fields_{language}.sqlite3")
+            if not os.path.exists(path) and not self.models.available(f"nlp_{language}"):
+                return None
+            # El sufijo separa estas entradas (lemas, POS, verbos) de las (lema, es_verbo)
+            version = spacy_model_version(self.spacy_models[language]) + ":pos"
+            self.caches[language] = NlpCache(path, version, max_entries=self.cache_max_entries)
+        return self.caches[language]
+
+    def _stage(self, name):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def cache_stats(self):
+        return {language: cache.stats() for language, cache in self.caches.items()
+                if language not in self.unavailable}
+
+    def close(self):
+        for cache in self.caches.values():
+            cache.close()
+        self.caches = {}
+
+    def results(self, top_words=20, top_verbs=10):
+        """Dict ``<campo>_<idioma>`` -> frecuencias de palabras, verbos y POS del campo."""
+        self.flush()
+        results = {}
+        for field, language in self.fields:
+            counter = self.counters[field_key(field, language)]
+            results[field_key(field, language)] = {
+                'field': field,
+                'language': language,
+                'model': self.spacy_models[language],
+                'available': language not in self.unavailable,
+                'texts': counter.texts,
+                'tokens': counter.tokens,
+                'word_freq': counter.words.most_common(top_words),
+                'verb_freq': counter.verbs.most_common(top_verbs),
+                'pos_freq': counter.pos.most_common(),
+            }
+        return results
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Máximo de parámetros por consulta IN (...) en SQLite
+_CHUNK = 500
+
+
+def spacy_model_version(model_name):
+    """Identificador del modelo instalado sin tener que cargarlo (nombre==versión)."""
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return f"{model_name}=={version(model_name)}"
+    except PackageNotFoundError:
+        return model_name
+
+
+class NlpCache:
+    """Caché en disco de los resultados de spaCy por fila.
+
+    Cada entrada guarda los pares (lema, es_verbo) de una traducción, con una
+    clave que combina el hash del texto y la versión del modelo: si cambia el
+    modelo, las entradas antiguas simplemente dejan de encontrarse. Al
+    superar ``max_entries`` se eliminan las menos usadas recientemente (LRU).
+    """
+
+    def __init__(self, path, model_version, max_entries=500000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS rows (key TEXT PRIMARY KEY, lemmas TEXT, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS rows_last_used ON rows (last_used)")
+        self.conn.commit()
+        # Número de filas: se cuenta una vez al abrir y se mantiene en put_many y _evict
+        (self.rows,) = self.conn.execute("SELECT COUNT(*) FROM rows").fetchone()
+
+    def key(self, text):
+        return hashlib.sha1(f"{self.model_version}\0{text}".encode('utf-8')).hexdigest()
+
+    def get_many(self, texts, count=True):
+        """Devuelve un dict texto -> pares (lema, es_verbo) de los textos en caché.
+
+        Con ``count=False`` no suma aciertos ni fallos (se registran después con ``count``).
+        """
+        keys = {self.key(text): text for text in set(texts)}
+        found = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), _CHUNK):
+            chunk = key_list[start:start + _CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for key, lemmas in self.conn.execute(
+                f"SELECT key, lemmas FROM rows WHERE key IN ({placeholders})", chunk
+            ):
+                found[keys[key]] = [tuple(pair) for pair in json.loads(lemmas)]
+            now = time.time()
+            self.conn.execute(
+                f"UPDATE rows SET last_used = ? WHERE key IN ({placeholders})", [now] + chunk
+            )
+        self.conn.commit()
+        if count:
+            self.count(len(found), len(keys) - len(found))
+        return found
+
+    def count(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+
+    def put_many(self, results):
+        """Guarda un dict texto -> pares (lema, es_verbo) y aplica el límite de tamaño."""
+        now = time.time()
+        params = [(self.key(text), json.dumps(pairs, ensure_ascii=False), now) for text, pairs in results.items()]
+        # INSERT OR IGNORE para saber cuántas claves son nuevas; las que ya
+        # existían (poco habitual: solo se guardan los fallos) se actualizan aparte
+        before = self.conn.total_changes
+        self.conn.executemany("INSERT OR IGNORE INTO rows (key, lemmas, last_used) VALUES (?, ?, ?)", params)
+        added = self.conn.total_changes - before
+        if added < len(params):
+            self.conn.executemany(
+                "UPDATE rows SET lemmas = ?, last_used = ? WHERE key = ?",
+                [(lemmas, last_used, key) for key, lemmas, last_used in params],
+            )
+        self.conn.commit()
+        self.rows += added
+        self._evict()
+
+    def _evict(self):
+        excess = self.rows - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM rows WHERE key IN (SELECT key FROM rows ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.conn.commit()
+            self.rows -= excess
+            self.evictions += excess
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
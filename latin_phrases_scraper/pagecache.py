@@ -0,0 +1,88 @@
+import hashlib
+import json
+import os
+import sqlite3
+import zlib
+from collections import namedtuple
+
+# Entrada guardada de una página: validadores HTTP, hash del contenido, cuerpo
+# comprimido y, si el spider ya la procesó, sus ítems, enlaces seguidos y la
+# versión del extractor que generó esos ítems.
+PageEntry = namedtuple('PageEntry', 'url etag last_modified content_type sha1 body items links extractor')
+
+
+def content_hash(body):
+    return hashlib.sha1(body).hexdigest()
+
+
+class PageStore:
+    """Almacén en disco (un único fichero SQLite) de páginas ya descargadas.
+
+    Los cuerpos y los ítems se guardan comprimidos con zlib, así que el
+    fichero ocupa una fracción del HTML original.
+    """
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_type TEXT,"
+            " sha1 TEXT, body BLOB, items BLOB, links TEXT, extractor TEXT)"
+        )
+        # Cachés creadas antes de guardar la versión del extractor: sus ítems
+        # quedan sin versión y no se reutilizan
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}
+        if 'extractor' not in columns:
+            self.conn.execute("ALTER TABLE pages ADD COLUMN extractor TEXT")
+        self.conn.commit()
+
+    def get(self, url):
+        row = self.conn.execute(
+            "SELECT url, etag, last_modified, content_type, sha1, body, items, links, extractor"
+            " FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        url, etag, last_modified, content_type, sha1, body, items, links, extractor = row
+        return PageEntry(
+            url, etag, last_modified, content_type, sha1,
+            zlib.decompress(body) if body is not None else None,
+            json.loads(zlib.decompress(items)) if items is not None else None,
+            json.loads(links) if links is not None else None,
+            extractor,
+        )
+
+    def save_page(self, url, etag, last_modified, content_type, body):
+        """Guarda una página nueva o modificada; sus ítems anteriores dejan de valer."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages"
+            " (url, etag, last_modified, content_type, sha1, body, items, links, extractor)"
+            " VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, NULL)",
+            (url, etag, last_modified, content_type, content_hash(body), zlib.compress(body)),
+        )
+        self.conn.commit()
+
+    def update_validators(self, url, etag, last_modified):
+        """Actualiza ETag/Last-Modified de una página cuyo contenido no cambió."""
+        self.conn.execute(
+            "UPDATE pages SET etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)"
+            " WHERE url = ?", (etag, last_modified, url)
+        )
+        self.conn.commit()
+
+    def save_items(self, url, items, links, extractor=None):
+        """Guarda los ítems extraídos de una página, las URLs que se siguieron desde ella
+        y la versión del extractor que los generó."""
+        self.conn.execute(
+            "UPDATE pages SET items = ?, links = ?, extractor = ? WHERE url = ?",
+            (zlib.compress(json.dumps(items).encode('utf-8')), json.dumps(links),
+             None if extractor is None else str(extractor), url),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -1,36 +1,199 @@
-import pandas as pd
 from collections import Counter
-import re
-import spacy
-from transformers import pipeline, set_seed
+from concurrent.futures import ProcessPoolExecutor
+import cProfile
+import json
+import multiprocessing
+import os
 import random
+import time
+
+from functools import partial
+
+from scrapy.exceptions import DropItem, NotConfigured
+
+from latin_phrases_scraper.analysis import (
+    LATIN_TOKEN_RE, LATIN_VERB_SUFFIXES, UNUSED_SPACY_COMPONENTS, IncrementalAnalyzer, LatinCounter
+)
+from latin_phrases_scraper.dedup import ONLINE_POLICIES, NearDuplicateIndex, write_report
+from latin_phrases_scraper.exporters import convert_to_excel, iter_export, open_exporter, phrases_to_excel
+from latin_phrases_scraper.generation import GenerationCache, build_prompt, generate_batch
+from latin_phrases_scraper.index import build_index
+from latin_phrases_scraper.similarity import build_similarity, similarity_path
+from latin_phrases_scraper.nlp_cache import NlpCache, spacy_model_version
+from latin_phrases_scraper.models import (
+    ModelRegistry, load_spacy_en, load_spanish_generator, peak_rss_mb
+)
+from latin_phrases_scraper.multilingual import MultiFieldAnalyzer, parse_fields
+from latin_phrases_scraper.profiling import StageProfiler
+from latin_phrases_scraper.store import PhraseStore
+from latin_phrases_scraper.workers import (
+    english_stage, export_stage, fields_stage, latin_stage, similarity_stage
+)
+
+# Etapas del análisis final, en orden
+ANALYSIS_STAGES = ('latin', 'english', 'fields', 'generation')
+
+
+class NearDuplicatePipeline:
+    """Detecta frases casi duplicadas (MinHash + LSH) antes de exportarlas.
+    
+    Con la política ``keep_all`` (por defecto) los duplicados se dejan pasar
+    y solo se informan; con ``keep_first`` se descartan con DropItem. Al cerrar se guarda
+    el informe de grupos en ``report_path``. La fusión (``merge``) se hace
+    sobre el dataset exportado: ``python -m latin_phrases_scraper.dedup``.
+    """
+    
+    def __init__(self, policy='keep_all', threshold=0.8, num_perm=64, bands=16,
+                 report_path=None, stats=None):
+        if policy not in ONLINE_POLICIES:
+            raise ValueError(f"Política de deduplicación no disponible durante la crawl: {policy!r} "
+                             f"(opciones: {', '.join(ONLINE_POLICIES)})")
+        self.policy = policy
+        self.index = NearDuplicateIndex(num_perm, bands, threshold)
+        self.report_path = report_path
+        self.stats = stats
+        self.profiler = StageProfiler(stats)
+    
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        if not settings.getbool('DEDUP_ENABLED'):
+            raise NotConfigured
+        return cls(
+            policy=settings.get('DEDUP_POLICY', 'keep_all'),
+            threshold=settings.getfloat('DEDUP_THRESHOLD', 0.8),
+            num_perm=settings.getint('DEDUP_NUM_PERM', 64),
+            bands=settings.getint('DEDUP_BANDS', 16),
+            report_path=settings.get('DEDUP_REPORT_PATH') or None,
+            stats=crawler.stats,
+        )
+    
+    def process_item(self, item, spider):
+        with self.profiler.stage('dedup'):
+            _, representative, score = self.index.add(item.get('latin_phrase'))
+        if representative is None:
+            return item
+        if self.stats is not None:
+            self.stats.inc_value('dedup/duplicates')
+        if self.policy == 'keep_first':
+            raise DropItem(f"Frase casi duplicada ({score:.2f}): {item.get('latin_phrase')!r}")
+        return item
+    
+    def close_spider(self, spider):
+        report = self.index.report()
+        if self.stats is not None:
+            self.stats.set_value('dedup/clusters', len(report['clusters']))
+        print(f"[INFO] Deduplicación: {report['duplicates']} frases casi duplicadas "
+              f"en {len(report['clusters'])} grupos ({self.policy})")
+        if self.report_path:
+            write_report(self.report_path, report)
+            print(f"[SUCCESS] Informe de duplicados guardado en '{self.report_path}'")
+
 
 class LatinPhrasesPipeline:
     """Pipeline para procesar, analizar y exportar los datos scrapeados."""
     
-    def __init__(self):
-        # Lista para acumular todos los ítems
-        self.phrases = []
+    def __init__(self, warmup=True, nlp_batch_size=1000, nlp_n_process=1, incremental=False,
+                 export_format='jsonl', export_path='latin_phrases_analysis.jsonl',
+                 export_chunk_size=1000, excel_path='latin_phrases_analysis.xlsx',
+                 report_json_path=None, index_path=None, nlp_cache_path=None,
+                 nlp_cache_max_entries=500000, close_workers=0, similarity_top_k=0,
+                 generator_model='PlanTL-GOB-ES/gpt2-base-bne', generation_backend='torch',
+                 generation_seed=None, generation_cache_path=None, stats=None,
+                 close_profile_path=None, latin_token_pattern=LATIN_TOKEN_RE.pattern,
+                 latin_verb_suffixes=LATIN_VERB_SUFFIXES, latin_rare_max_count=2,
+                 latin_extra_stopwords=(), analysis_fields=(), spacy_models=None):
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.process_time()
+        self._opened_at = None
         
-        # Cargar modelo de spaCy para inglés
-        print("[INFO] Cargando modelo de spaCy para inglés...")
-        self.nlp_en = spacy.load("en_core_web_sm")
+        # Tiempo de reloj, CPU y RSS pico por etapa (también en las stats de
+        # la crawl si se pasa ``stats``). Con close_profile_path, close_spider
+        # se ejecuta bajo cProfile y el perfil se guarda en ese fichero.
+        self.profiler = StageProfiler(stats)
+        self.close_profile_path = close_profile_path
         
-        # Modelo más ligero para generación en español
-        try:
-            self.generator = pipeline(
-                'text-generation',
-                model='PlanTL-GOB-ES/gpt2-base-bne',  # Modelo más pequeño
-                device=-1
+        # Con close_workers > 0, el análisis final se ejecuta en un pool de
+        # procesos fuera del reactor y close_spider devuelve un Deferred
+        self.close_workers = close_workers
+        
+        # Almacén columnar con textos deduplicados para acumular los ítems
+        # (solo hace falta para el análisis por lotes; en modo incremental no
+        # se guardan)
+        self.phrases = PhraseStore()
+        self.item_count = 0
+        
+        # Exportación por bloques a medida que llegan los ítems; la conversión
+        # a Excel es un paso final opcional (excel_path=None la desactiva)
+        self.export_format = export_format
+        self.export_path = export_path
+        self.export_chunk_size = export_chunk_size
+        self.excel_path = excel_path
+        self.exporter = None
+        self.report_json_path = report_json_path
+        # Índice invertido y de prefijos de las frases (index_path=None lo desactiva)
+        self.index_path = index_path
+        # Frases relacionadas por TF-IDF, guardadas junto a la exportación (0 lo desactiva)
+        self.similarity_top_k = similarity_top_k
+        self.similarity_path = similarity_path(export_path)
+        
+        # Los modelos (spaCy y GPT-2) se cargan bajo demanda: una crawl que no
+        # recolecta ítems nunca los carga. Con warmup=True se precargan en un
+        # hilo en segundo plano en cuanto llega el primer ítem.
+        self.models = ModelRegistry()
+        self.models.profiler = self.profiler
+        self.models.register('nlp_en', partial(load_spacy_en, exclude=UNUSED_SPACY_COMPONENTS))
+        self.models.register('generator', partial(  # Modelo más pequeño
+            load_spanish_generator, generator_model, backend=generation_backend))
+        self.warmup = warmup
+        self._warmup_started = False
+        
+        # Generación de frases: todas en una sola llamada al modelo y, con
+        # semilla fija, memorizadas en disco para reejecuciones deterministas
+        self.generator_model = generator_model
+        self.generation_backend = generation_backend
+        self.generation_seed = generation_seed
+        self.generation_cache = GenerationCache(generation_cache_path) if generation_cache_path else None
+        self.generation_source = None
+        
+        # Opciones del análisis por lotes con spaCy
+        self.nlp_batch_size = nlp_batch_size
+        self.nlp_n_process = nlp_n_process
+        
+        # Modo incremental: los contadores se actualizan en process_item y
+        # close_spider solo calcula los top-N
+        self.incremental = incremental
+        # Caché persistente de lemas/POS por fila (nlp_cache_path=None la desactiva)
+        self.nlp_cache = None
+        if nlp_cache_path:
+            self.nlp_cache = NlpCache(nlp_cache_path, spacy_model_version("en_core_web_sm"),
+                                      max_entries=nlp_cache_max_entries)
+        self.analyzer = IncrementalAnalyzer(
+            lambda: self.nlp_en, batch_size=nlp_batch_size, n_process=nlp_n_process,
+            flush_size=nlp_batch_size * nlp_n_process, cache=self.nlp_cache,
+            profiler=self.profiler,
+            latin_counter=LatinCounter(latin_token_pattern, latin_verb_suffixes, latin_rare_max_count)
+        )
+        
+        # Análisis por campo e idioma (p. ej. "translation:en", "notes:en"): una
+        # pasada de nlp.pipe por idioma para todos sus campos, con frecuencias y
+        # POS por campo. Si incluye translation:en, sustituye a la pasada en
+        # inglés de siempre (las frecuencias en inglés salen de ese campo).
+        self.fields = None
+        if analysis_fields:
+            self.fields = MultiFieldAnalyzer(
+                self.models, parse_fields(analysis_fields), batch_size=nlp_batch_size,
+                n_process=nlp_n_process, flush_size=nlp_batch_size * nlp_n_process,
+                profiler=self.profiler, spacy_models=spacy_models,
+                cache_dir=(os.path.dirname(nlp_cache_path) or ".") if nlp_cache_path else None,
+                cache_max_entries=nlp_cache_max_entries,
             )
-            self.model_loaded = True
-        except:
-            self.model_loaded = False
         
         # Lista mejorada de stopwords en latín (se ampliará dinámicamente)
         self.latin_stopwords = {'et', 'in', 'non', 'est', 'ad', 'cum', 'ex', 'de', 'ut', 'sed', 
                                 'si', 'quod', 'a', 'ab', 'per', 'sine', 'pro', 'ante', 'post', 
                                 'inter', 'sub', 'super', 'contra', 'apud'}
+        self.latin_stopwords.update(latin_extra_stopwords)
         
         # Verbos españoles comunes para conjugación (sin plantillas predefinidas)
         self.spanish_verb_conjugations = {
@@ -44,9 +207,93 @@ class LatinPhrasesPipeline:
             'querer': ['quiere', 'quieren', 'quería', 'quiso', 'queriendo']
         }
     
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(
+            warmup=settings.getbool('MODEL_WARMUP', True),
+            nlp_batch_size=settings.getint('NLP_BATCH_SIZE', 1000),
+            nlp_n_process=settings.getint('NLP_N_PROCESS', 1),
+            incremental=settings.getbool('ANALYSIS_INCREMENTAL', False),
+            export_format=settings.get('EXPORT_FORMAT', 'jsonl'),
+            export_path=settings.get('EXPORT_PATH', 'latin_phrases_analysis.jsonl'),
+            export_chunk_size=settings.getint('EXPORT_CHUNK_SIZE', 1000),
+            excel_path=settings.get('EXPORT_EXCEL_PATH') or None,
+            report_json_path=settings.get('REPORT_JSON_PATH') or None,
+            index_path=settings.get('INDEX_PATH') or None,
+            close_workers=settings.getint('CLOSE_WORKERS', 0),
+            similarity_top_k=settings.getint('SIMILARITY_TOP_K', 0),
+            nlp_cache_path=settings.get('NLP_CACHE_PATH') if settings.getbool('NLP_CACHE_ENABLED') else None,
+            nlp_cache_max_entries=settings.getint('NLP_CACHE_MAX_ENTRIES', 500000),
+            generator_model=settings.get('GENERATION_MODEL', 'PlanTL-GOB-ES/gpt2-base-bne'),
+            generation_backend=settings.get('GENERATION_BACKEND', 'torch'),
+            generation_seed=settings.getint('GENERATION_SEED') if settings.get('GENERATION_SEED') is not None else None,
+            generation_cache_path=settings.get('GENERATION_CACHE_PATH') or None,
+            stats=crawler.stats,
+            close_profile_path=settings.get('PROFILE_CLOSE_SPIDER_PATH') or None,
+            latin_token_pattern=settings.get('LATIN_TOKEN_PATTERN', LATIN_TOKEN_RE.pattern),
+            latin_verb_suffixes=settings.getlist('LATIN_VERB_SUFFIXES', LATIN_VERB_SUFFIXES),
+            latin_rare_max_count=settings.getint('LATIN_RARE_MAX_COUNT', 2),
+            latin_extra_stopwords=settings.getlist('LATIN_EXTRA_STOPWORDS', []),
+            analysis_fields=settings.getlist('ANALYSIS_FIELDS', []),
+            spacy_models=settings.getdict('ANALYSIS_SPACY_MODELS', {}),
+        )
+    
+    @property
+    def nlp_en(self):
+        """Modelo de spaCy para inglés (se carga la primera vez que se usa)."""
+        return self.models.get('nlp_en')
+    
+    @property
+    def generator(self):
+        """Pipeline de generación en español (se carga la primera vez que se usa)."""
+        return self.models.get('generator')
+    
+    @property
+    def fields_cover_english(self):
+        """Indica si el análisis por campos incluye las traducciones en inglés."""
+        return self.fields is not None and ('translation', 'en') in self.fields.fields
+    
+    @property
+    def _use_pool(self):
+        # El perfil con cProfile solo ve el proceso principal: en ese caso, síncrono
+        return self.close_workers > 0 and not self.close_profile_path
+    
+    @property
+    def model_loaded(self):
+        """Indica si el modelo generativo está disponible."""
+        return self.models.available('generator')
+    
+    def open_spider(self, spider):
+        """Informa del tiempo de arranque y la memoria antes de la primera petición."""
+        self._opened_at = time.perf_counter()
+        startup = self._opened_at - self._started_at
+        self.profiler.record('startup', startup, time.process_time() - self._cpu_started_at)
+        print(f"[INFO] Pipeline listo en {startup:.3f}s (RSS pico: {peak_rss_mb():.0f} MB)")
+    
     def process_item(self, item, spider):
-        """Método llamado por Scrapy para cada ítem. Lo guardamos en la lista."""
-        self.phrases.append(dict(item))
+        """Método llamado por Scrapy para cada ítem. Lo exportamos y lo guardamos para el análisis."""
+        if self.warmup and not self._warmup_started:
+            # Primer ítem: empezamos a cargar los modelos mientras sigue la crawl
+            self._warmup_started = True
+            if self._use_pool and not self.incremental:
+                # spaCy se carga en el proceso de trabajo del análisis en inglés
+                self.models.warm_up('generator')
+            else:
+                self.models.warm_up()
+        if self.exporter is None:
+            self.exporter = open_exporter(self.export_format, self.export_path, self.export_chunk_size)
+        row = dict(item)
+        with self.profiler.stage('export'):
+            self.exporter.write(row)
+        self.item_count += 1
+        if self.incremental:
+            translation = None if self.fields_cover_english else item.get('translation')
+            self.analyzer.add(item.get('latin_phrase'), translation)
+            if self.fields is not None:
+                self.fields.add(row)
+        else:
+            self.phrases.append(row)
         return item
     
     def extract_keywords_with_context(self, text, nlp_model, top_n=10):
@@ -62,44 +309,43 @@ class LatinPhrasesPipeline:
         
         return Counter(keywords).most_common(top_n)
     
+    def generate_spanish_phrases(self, n, latin_words, spanish_verbs, english_verbs):
+        """Genera ``n`` frases en español con una sola llamada al modelo (o por reglas)."""
+        self.generation_source = 'reglas'
+        
+        if len(latin_words) >= 3 and len(spanish_verbs) >= 2:
+            prompt = build_prompt(latin_words, spanish_verbs)
+            
+            # Con semilla fija, las frases ya generadas se reutilizan sin cargar el modelo
+            key = None
+            if self.generation_cache is not None and self.generation_seed is not None:
+                key = GenerationCache.key(self.generator_model, self.generation_backend,
+                                          prompt, self.generation_seed, n)
+                cached = self.generation_cache.get(key)
+                if cached is not None:
+                    self.generation_source = 'caché'
+                    return cached
+            
+            # Si el modelo está cargado, usarlo para generación
+            if self.model_loaded:
+                try:
+                    phrases = generate_batch(self.generator, prompt, n, seed=self.generation_seed)
+                    self.generation_source = 'modelo'
+                    if key is not None:
+                        self.generation_cache.put(key, phrases)
+                    return phrases
+                except Exception as e:
+                    print(f"[WARNING] Error en generación con modelo: {e}")
+                    # Continuar con generación por reglas
+        
+        return [self.rule_based_phrase(latin_words, spanish_verbs) for _ in range(n)]
+    
     def generate_spanish_phrase(self, latin_words, spanish_verbs, english_verbs):
         """Genera una frase en español automáticamente usando el modelo o reglas."""
-        
-        # Si el modelo está cargado, usarlo para generación
-        if self.model_loaded and len(latin_words) >= 3 and len(spanish_verbs) >= 2:
-            try:
-                # Crear prompt para el modelo generativo
-                prompt_words = ", ".join(latin_words[:3])
-                prompt_verbs = ", ".join(spanish_verbs[:2])
-                
-                prompt = f"Genera una frase significativa en español que incluya las palabras latinas '{prompt_words}' y los verbos '{prompt_verbs}':"
-                
-                # Generar texto con el modelo
-                generated = self.generator(
-                    prompt,
-                    max_length=50,
-                    num_return_sequences=1,
-                    temperature=0.8,
-                    do_sample=True,
-                    top_p=0.9
-                )
-                
-                # Extraer y limpiar la frase generada
-                raw_text = generated[0]['generated_text']
-                phrase = raw_text.replace(prompt, '').strip()
-                
-                # Limpiar la frase (quitar texto no deseado)
-                if ':' in phrase:
-                    phrase = phrase.split(':', 1)[1].strip()
-                if '.' in phrase:
-                    # Tomar solo la primera oración
-                    phrase = phrase.split('.', 1)[0] + '.'
-                
-                return phrase.capitalize()
-                
-            except Exception as e:
-                print(f"[WARNING] Error en generación con modelo: {e}")
-                # Continuar con generación por reglas
+        return self.generate_spanish_phrases(1, latin_words, spanish_verbs, english_verbs)[0]
+    
+    def rule_based_phrase(self, latin_words, spanish_verbs):
+        """Genera una frase en español con patrones gramaticales básicos."""
         
         # GENERACIÓN POR REGLAS (respaldo)
         # Crear frases usando patrones gramaticales básicos en español
@@ -138,53 +384,216 @@ class LatinPhrasesPipeline:
     
     def close_spider(self, spider):
         """Método llamado cuando el spider termina. Aquí hacemos el análisis final."""
-        print(f"\n[INFO] Spider finalizado. Se recolectaron {len(self.phrases)} frases.")
+        print(f"\n[INFO] Spider finalizado. Se recolectaron {self.item_count} frases.")
         
-        if not self.phrases:
+        if self._opened_at is not None:
+            elapsed = time.perf_counter() - self._opened_at
+            self.profiler.set_value('items_per_sec', self.item_count / elapsed if elapsed else 0.0)
+        
+        if not self.item_count:
             print("[WARNING] No se recolectaron datos.")
             return
         
-        # 1. Crear DataFrame y guardar en Excel
-        df = pd.DataFrame(self.phrases)
-        output_file = "latin_phrases_analysis.xlsx"
-        df.to_excel(output_file, index=False)
-        print(f"[SUCCESS] Datos guardados en '{output_file}'")
+        # Ya no llegan más ítems: los textos del PhraseStore pasan a buffers
+        # inmutables que pandas/Arrow pueden compartir sin copiarlos
+        if not self.incremental:
+            self.phrases.freeze()
         
-        # 2. ANÁLISIS DE LATÍN
-        all_latin_text = " ".join(df['latin_phrase'].dropna().astype(str))
+        if self._use_pool:
+            from twisted.internet import threads
+            with self.profiler.stage('export'):
+                self.exporter.close()
+            print(f"[SUCCESS] Datos guardados en '{self.export_path}'")
+            # Las cachés SQLite solo se pueden usar desde el hilo que las
+            # abrió: el último lote pendiente se analiza aquí, antes del hilo
+            self.analyzer.flush()
+            if self.fields is not None:
+                self.fields.flush()
+            # El hilo solo espera a los procesos de trabajo y genera las
+            # frases: el reactor queda libre mientras tanto
+            return threads.deferToThread(self._finish_in_pool)
         
-        # Extraer palabras latinas (palabras de 3+ letras)
-        latin_words = re.findall(r'\b[a-z]{3,}\b', all_latin_text.lower())
+        if not self.close_profile_path:
+            return self._finish(spider)
         
-        # Filtrar stopwords dinámicamente: añadir palabras de 1-2 ocurrencias
-        word_counts = Counter(latin_words)
-        rare_words = {word for word, count in word_counts.items() if count <= 2}
-        self.latin_stopwords.update(rare_words)
+        # Perfil de close_spider en formato pstats (snakeviz, pstats, etc.)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(self._finish, spider)
+        finally:
+            profile.dump_stats(self.close_profile_path)
+            print(f"[INFO] Perfil de close_spider guardado en '{self.close_profile_path}'")
+    
+    def _finish(self, spider):
+        """Exportación final, análisis e informes (el cuerpo de close_spider)."""
+        # 1. Cerrar la exportación por bloques y, opcionalmente, convertir a Excel
+        with self.profiler.stage('export'):
+            self.exporter.close()
+        print(f"[SUCCESS] Datos guardados en '{self.export_path}'")
+        if self.excel_path:
+            with self.profiler.stage('excel'):
+                if self.incremental:
+                    convert_to_excel(self.export_path, self.excel_path, self.export_format)
+                else:
+                    phrases_to_excel(self.phrases, self.excel_path)
+            print(f"[SUCCESS] Datos convertidos a Excel en '{self.excel_path}'")
+        if self.index_path:
+            # En modo incremental las frases no se guardan en memoria: se relee la exportación
+            rows = iter_export(self.export_path, self.export_format) if self.incremental else self.phrases
+            with self.profiler.stage('index'):
+                info = build_index(rows, self.index_path)
+            self.profiler.set_value('index_bytes', info['bytes'])
+            print(f"[SUCCESS] Índice de {info['terms']} términos guardado en '{self.index_path}' "
+                  f"({info['bytes'] / 1024:.0f} KB, {info['build_s']:.2f}s)")
+        if self.similarity_top_k:
+            rows = iter_export(self.export_path, self.export_format) if self.incremental else self.phrases
+            with self.profiler.stage('similarity'):
+                try:
+                    info = build_similarity(rows, self.similarity_path, self.similarity_top_k)
+                except ImportError:
+                    info = None
+            self._report_similarity(info)
         
-        filtered_latin = [w for w in latin_words if w not in self.latin_stopwords]
-        latin_word_freq = Counter(filtered_latin).most_common(20)
+        # En modo por lotes el análisis de latín recorre ahora las frases
+        # guardadas; en modo incremental los contadores ya están completos.
+        translations = None
+        if not self.incremental:
+            self.analyzer.add_latin_many(self.phrases.column('latin_phrase'))
+            if self.fields is not None:
+                self.fields.add_columns(self.phrases.columns)
+            if not self.fields_cover_english:
+                translations = self.phrases.column('translation')
         
-        # Identificar verbos latinos por sufijos comunes
-        latin_verbs = [word for word in filtered_latin 
-                      if any(word.endswith(suffix) for suffix in ['are', 'ere', 'ire', 'avi', 'ivi', 'atus', 'itus'])]
-        latin_verb_freq = Counter(latin_verbs).most_common(10) if latin_verbs else []
+        results = self.run_analysis(translations=translations)
+        self.write_reports(results, json_path=self.report_json_path)
+    
+    def _finish_in_pool(self):
+        """Excel, índice, latín e inglés en paralelo en procesos; después, generación e informes."""
+        with self.profiler.stage('close_spider'):
+            # spawn: hacer fork de un proceso con el reactor y sus hilos no es seguro
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=self.close_workers, mp_context=context) as pool:
+                # Sin modo incremental, Excel e índice salen del PhraseStore
+                # (se envía con sus buffers) y no se relee la exportación
+                export = pool.submit(export_stage, self.export_path, self.export_format,
+                                     self.excel_path, self.index_path,
+                                     None if self.incremental else self.phrases)
+                similarity = None
+                if self.similarity_top_k:
+                    similarity = pool.submit(similarity_stage, self.export_path, self.export_format,
+                                             self.similarity_path, self.similarity_top_k)
+                latin = english = fields = None
+                if not self.incremental:
+                    # Las columnas se envían como buffers, sin crear un str por fila
+                    latin = pool.submit(latin_stage, self.phrases.columns['latin_phrase'],
+                                        self.latin_stopwords, self.analyzer.latin)
+                    if self.fields is not None:
+                        analyzer = self.fields
+                        columns = {field: self.phrases.columns[field] for field, _ in analyzer.fields
+                                   if field in self.phrases.columns}
+                        fields = pool.submit(fields_stage, columns, analyzer.fields, self.nlp_batch_size,
+                                             self.nlp_n_process, analyzer.cache_dir,
+                                             analyzer.cache_max_entries, analyzer.spacy_models)
+                    if not self.fields_cover_english:
+                        cache = self.nlp_cache
+                        english = pool.submit(english_stage, self.phrases.columns['translation'],
+                                              self.nlp_batch_size, self.nlp_n_process,
+                                              cache.path if cache is not None else None,
+                                              cache.max_entries if cache is not None else 0)
+                
+                # La generación necesita los resultados de latín e inglés, pero
+                # no espera a la conversión a Excel ni al índice
+                if latin is not None:
+                    latin = self._stage_result('latin_counting', latin)
+                if english is not None:
+                    english = self._stage_result('english_nlp', english)
+                if fields is not None:
+                    fields = self._stage_result('fields_nlp', fields)
+                results = self.run_analysis(latin=latin, english=english, fields=fields)
+                
+                info = self._stage_result('export_files', export)
+                if similarity is not None:
+                    self._report_similarity(self._stage_result('similarity', similarity))
+            if self.excel_path:
+                print(f"[SUCCESS] Datos convertidos a Excel en '{self.excel_path}'")
+            if info is not None:
+                self.profiler.set_value('index_bytes', info['bytes'])
+                print(f"[SUCCESS] Índice de {info['terms']} términos guardado en '{self.index_path}' "
+                      f"({info['bytes'] / 1024:.0f} KB, {info['build_s']:.2f}s)")
+        self.write_reports(results, json_path=self.report_json_path)
+    
+    def _report_similarity(self, info):
+        if info is None:
+            print("[WARNING] No se calcularon las frases relacionadas (SIMILARITY_TOP_K): "
+                  "requieren NumPy y SciPy")
+            return
+        self.profiler.set_value('similarity_bytes', info['bytes'])
+        print(f"[SUCCESS] Frases relacionadas (top-{info['k']}) guardadas en '{self.similarity_path}' "
+              f"(TF-IDF {info['tfidf_s']:.2f}s, vecinos {info['top_k_s']:.2f}s)")
+    
+    def _stage_result(self, name, future):
+        """Espera una etapa del pool y suma sus métricas al perfil."""
+        result, metrics = future.result()
+        self.profiler.record(name, metrics['wall_s'], metrics['cpu_s'], rss=metrics['peak_rss_mb'])
+        return result
+    
+    def run_analysis(self, stages=ANALYSIS_STAGES, translations=None, latin=None, english=None,
+                     fields=None):
+        """Ejecuta las etapas de análisis indicadas y devuelve un dict con los resultados.
         
-        # 3. ANÁLISIS DE INGLÉS CON SPACY (PALABRAS Y VERBOS)
-        all_english_text = " ".join(df['translation'].dropna().astype(str))
-        doc_en = self.nlp_en(all_english_text)
+        Los contadores de latín (y los de inglés si ``translations`` es None)
+        deben venir ya alimentados en ``self.analyzer``, ítem a ítem, y los
+        de los campos en ``self.fields``, salvo que se pasen ya calculados en
+        ``latin`` (resultado de ``latin_stage``), ``english`` (resultado de
+        ``english_stage``) y ``fields`` (resultado de ``fields_stage``).
+        """
+        results = {'items': self.item_count, 'stages': list(stages)}
+        english_extra = {}
+        load_times = {}
         
-        # Filtrar tokens: palabras alfabéticas, no stopwords
-        english_tokens = [token for token in doc_en if token.is_alpha and not token.is_stop]
+        # 2. ANÁLISIS DE LATÍN
+        # Palabras latinas (3+ letras) y verbos por sufijos comunes.
+        # Filtrar stopwords dinámicamente: añadir palabras de 1-2 ocurrencias
+        latin_word_freq, latin_verb_freq = [], []
+        if 'latin' in stages and latin is not None:
+            latin_word_freq, latin_verb_freq, rare_words = latin
+            self.latin_stopwords.update(rare_words)
+        elif 'latin' in stages:
+            with self.profiler.stage('latin_counting'):
+                latin_word_freq, latin_verb_freq, rare_words = self.analyzer.latin_results(self.latin_stopwords)
+            self.latin_stopwords.update(rare_words)
         
-        # Frecuencia de TODAS las palabras en inglés (lematizadas)
-        english_words = [token.lemma_.lower() for token in english_tokens]
-        english_word_freq = Counter(english_words).most_common(20)
+        # 3. ANÁLISIS POR CAMPO E IDIOMA (TRADUCCIONES, NOTAS...)
+        # Una pasada de nlp.pipe por idioma con los textos distintos de todos
+        # sus campos; lemas, verbos y POS se cuentan por campo
+        field_results, fields_cache = {}, {}
+        if fields is not None:
+            field_results, fields_cache, fields_load_times = fields
+            load_times.update(fields_load_times)
+        elif self.fields is not None and ('fields' in stages or ('english' in stages and self.fields_cover_english)):
+            field_results = self.fields.results()
+            fields_cache = self.fields.cache_stats()
         
-        # Frecuencia de VERBOS en inglés (usando POS tagging de spaCy)
-        english_verbs = [token.lemma_.lower() for token in english_tokens if token.pos_ == "VERB"]
-        english_verb_freq = Counter(english_verbs).most_common(10) if english_verbs else []
+        # 4. ANÁLISIS DE INGLÉS CON SPACY (PALABRAS Y VERBOS)
+        # Cada traducción se procesa como un Doc propio, en lotes con nlp.pipe
+        # (las que ya están en la caché no pasan por el modelo). Se cuentan
+        # palabras alfabéticas sin stopwords (lematizadas) y, por POS tagging,
+        # los verbos. Si el análisis por campos ya cubre translation:en, se
+        # usan sus resultados.
+        english_word_freq, english_verb_freq = [], []
+        if 'english' in stages and english is not None:
+            english_word_freq, english_verb_freq, english_extra['nlp_cache'], english_load_times = english
+            load_times.update(english_load_times)
+        elif 'english' in stages and 'translation_en' in field_results:
+            english_word_freq = field_results['translation_en']['word_freq']
+            english_verb_freq = field_results['translation_en']['verb_freq']
+        elif 'english' in stages:
+            self.analyzer.add_translations(translations if translations is not None else ())
+            english_word_freq, english_verb_freq = self.analyzer.english_results()
+            if self.nlp_cache is not None:
+                english_extra['nlp_cache'] = self.nlp_cache.stats()
         
-        # 4. PREPARAR DATOS PARA GENERACIÓN
+        # 5. PREPARAR DATOS PARA GENERACIÓN
         top_latin_words = [word for word, _ in latin_word_freq[:5]]
         top_english_verbs = [verb for verb, _ in english_verb_freq[:5]] if english_verb_freq else ['be', 'have', 'do', 'make', 'say']
         
@@ -206,40 +615,82 @@ class LatinPhrasesPipeline:
                 # Si no está en el mapeo, usar el verbo en inglés como base
                 top_spanish_verbs.append(eng_verb)
         
-        # 5. GENERAR 5 FRASES EN ESPAÑOL AUTOMÁTICAMENTE
+        # 6. GENERAR 5 FRASES EN ESPAÑOL AUTOMÁTICAMENTE (una sola llamada al modelo)
         spanish_phrases = []
-        for i in range(5):
-            phrase = self.generate_spanish_phrase(top_latin_words, top_spanish_verbs, top_english_verbs)
-            spanish_phrases.append(phrase)
+        if 'generation' in stages:
+            with self.profiler.stage('generation'):
+                spanish_phrases = self.generate_spanish_phrases(5, top_latin_words, top_spanish_verbs, top_english_verbs)
+            generator_used = {
+                'modelo': f'BERTIN GPT-J ({self.generation_backend})',
+                'caché': f'BERTIN GPT-J (caché, semilla {self.generation_seed})',
+            }.get(self.generation_source, 'Generación por reglas')
+        else:
+            generator_used = 'Ninguno (etapa no ejecutada)'
         
-        # 6. GUARDAR RESULTADOS COMPLETOS
-        with open("analisis_frecuencias.txt", "w", encoding='utf-8') as f:
+        results.update({
+            'latin_word_freq': latin_word_freq,
+            'latin_verb_freq': latin_verb_freq,
+            'english_word_freq': english_word_freq,
+            'english_verb_freq': english_verb_freq,
+            'fields': field_results,
+            'top_latin_words': top_latin_words,
+            'top_english_verbs': top_english_verbs,
+            'top_spanish_verbs': top_spanish_verbs,
+            'spanish_phrases': spanish_phrases,
+            'generator_used': generator_used,
+            'model_load_times': {**load_times, **self.models.load_times},
+            # Solo si la pasada en inglés de siempre se ejecutó (no cuando sale de los campos)
+            'nlp_cache': english_extra.get('nlp_cache'),
+            'fields_nlp_cache': fields_cache or None,
+            'peak_rss_mb': peak_rss_mb(),
+            'profile': self.profiler.report(),
+        })
+        return results
+    
+    def write_reports(self, results, text_path="analisis_frecuencias.txt", json_path=None):
+        """Escribe el informe de texto y, si se indica ``json_path``, el informe JSON."""
+        # 7. GUARDAR RESULTADOS COMPLETOS
+        load_times = ", ".join(f"{name}={secs:.2f}s" for name, secs in results['model_load_times'].items())
+        spanish_phrases = results['spanish_phrases']
+
+        with open(text_path, "w", encoding='utf-8') as f:
             f.write("="*60 + "\n")
             f.write("ANÁLISIS COMPLETO DE FRECUENCIAS\n")
             f.write("="*60 + "\n\n")
             
             f.write("TOP 20 PALABRAS EN LATÍN (excluyendo stopwords):\n")
-            for word, freq in latin_word_freq:
+            for word, freq in results['latin_word_freq']:
                 f.write(f"  {word}: {freq}\n")
             
             f.write("\nTOP 10 VERBOS EN LATÍN (identificados por sufijos):\n")
-            if latin_verb_freq:
-                for verb, freq in latin_verb_freq:
+            if results['latin_verb_freq']:
+                for verb, freq in results['latin_verb_freq']:
                     f.write(f"  {verb}: {freq}\n")
             else:
                 f.write("  No se identificaron verbos claros por sufijos\n")
             
             f.write("\nTOP 20 PALABRAS EN INGLÉS (lematizadas, sin stopwords):\n")
-            for word, freq in english_word_freq:
+            for word, freq in results['english_word_freq']:
                 f.write(f"  {word}: {freq}\n")
             
             f.write("\nTOP 10 VERBOS EN INGLÉS (lematizados):\n")
-            if english_verb_freq:
-                for verb, freq in english_verb_freq:
+            if results['english_verb_freq']:
+                for verb, freq in results['english_verb_freq']:
                     f.write(f"  {verb}: {freq}\n")
             else:
                 f.write("  No se identificaron verbos en inglés\n")
             
+            for field in results.get('fields', {}).values():
+                f.write(f"\nCAMPO '{field['field']}' ({field['language']}, {field['model']}): "
+                        f"{field['texts']} textos, {field['tokens']} tokens\n")
+                if not field['available']:
+                    f.write("  Modelo no disponible\n")
+                    continue
+                f.write("  Palabras: " + ", ".join(f"{word} ({freq})" for word, freq in field['word_freq']) + "\n")
+                f.write("  Verbos: " + (", ".join(f"{verb} ({freq})" for verb, freq in field['verb_freq'])
+                                        or "ninguno") + "\n")
+                f.write("  POS: " + ", ".join(f"{pos} ({freq})" for pos, freq in field['pos_freq']) + "\n")
+            
             f.write("\n" + "="*60 + "\n")
             f.write("5 FRASES GENERADAS EN ESPAÑOL (AUTOMÁTICAS)\n")
             f.write("="*60 + "\n")
@@ -250,14 +701,31 @@ class LatinPhrasesPipeline:
             f.write("\n" + "="*60 + "\n")
             f.write("RESUMEN EJECUTIVO\n")
             f.write("="*60 + "\n")
-            f.write(f"Palabras latín más usadas: {top_latin_words}\n")
-            f.write(f"Verbos inglés más usados: {top_english_verbs}\n")
-            f.write(f"Verbos traducidos al español: {top_spanish_verbs}\n")
-            f.write(f"Modelo generativo usado: {'BERTIN GPT-J' if self.model_loaded else 'Generación por reglas'}\n")
-        
-        print("[SUCCESS] Análisis completado y guardado en 'analisis_frecuencias.txt'")
-        print("\n" + "="*60)
-        print("FRASES GENERADAS AUTOMÁTICAMENTE:")
-        print("="*60)
-        for i, frase in enumerate(spanish_phrases, 1):
-            print(f"{i}. {frase}")
\ No newline at end of file
+            f.write(f"Palabras latín más usadas: {results['top_latin_words']}\n")
+            f.write(f"Verbos inglés más usados: {results['top_english_verbs']}\n")
+            f.write(f"Verbos traducidos al español: {results['top_spanish_verbs']}\n")
+            f.write(f"Modelo generativo usado: {results['generator_used']}\n")
+            f.write(f"Tiempos de carga de modelos: {load_times or 'ninguno'}\n")
+            caches = {}
+            if results['nlp_cache']:
+                caches["inglés"] = results['nlp_cache']
+            for language, cache in (results['fields_nlp_cache'] or {}).items():
+                caches[f"campos, {language}"] = cache
+            for name, cache in caches.items():
+                f.write(f"Caché de spaCy ({name}): {cache['hits']} aciertos, {cache['misses']} fallos "
+                        f"({cache['hit_rate']:.0%}), {cache['evictions']} desalojos\n")
+            f.write(f"Memoria RSS pico: {results['peak_rss_mb']:.0f} MB\n")
+        
+        print(f"[SUCCESS] Análisis completado y guardado en '{text_path}'")
+        
+        if json_path:
+            with open(json_path, "w", encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            print(f"[SUCCESS] Informe JSON guardado en '{json_path}'")
+        
+        if spanish_phrases:
+            print("\n" + "="*60)
+            print("FRASES GENERADAS AUTOMÁTICAMENTE:")
+            print("="*60)
+            for i, frase in enumerate(spanish_phrases, 1):
+                print(f"{i}. {frase}")
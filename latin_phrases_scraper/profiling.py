@@ -0,0 +1,104 @@
+import json
+import time
+from contextlib import contextmanager
+
+from latin_phrases_scraper.models import peak_rss_mb
+
+
+class StageProfiler:
+    """Acumula tiempo de reloj y de CPU por etapa, junto al RSS pico del proceso.
+
+    Si se le pasa el stats collector de la crawl, cada medición se refleja
+    también en las estadísticas de Scrapy con el prefijo ``profile/<etapa>/``.
+    El tiempo de CPU es el del proceso completo, así que incluye el de los
+    hilos que trabajen en paralelo (p. ej. el warm-up de modelos). Lo mismo
+    pasa con ``process_peak_rss_mb``: es el RSS máximo que ha alcanzado el
+    proceso (``ru_maxrss``) al terminar la etapa, no la memoria que usó ella.
+    """
+
+    def __init__(self, stats=None):
+        self.stats = stats
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+
+    def record(self, name, wall, cpu, calls=1, rss=None):
+        """Suma una medición; ``rss`` permite indicar el RSS pico de otro proceso (p. ej. un worker)."""
+        entry = self.stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'process_peak_rss_mb': 0.0})
+        rss = peak_rss_mb() if rss is None else rss
+        entry['calls'] += calls
+        entry['wall_s'] += wall
+        entry['cpu_s'] += cpu
+        entry['process_peak_rss_mb'] = max(entry['process_peak_rss_mb'], rss)
+        if self.stats is not None:
+            prefix = f"profile/{name}/"
+            self.stats.inc_value(prefix + "calls", calls)
+            self.stats.inc_value(prefix + "wall_s", wall)
+            self.stats.inc_value(prefix + "cpu_s", cpu)
+            self.stats.max_value(prefix + "process_peak_rss_mb", rss)
+
+    def set_value(self, name, value):
+        """Guarda una métrica suelta (p. ej. ítems/s) en el informe y en las stats."""
+        self.stages.setdefault('metrics', {})[name] = value
+        if self.stats is not None:
+            self.stats.set_value(f"profile/{name}", value)
+
+    def report(self):
+        return self.stages
+
+
+def timed_iter(iterable, profiler, name):
+    """Itera ``iterable`` sumando a la etapa ``name`` solo el tiempo que pasa dentro de él.
+
+    Sirve para medir generadores perezosos (como los callbacks del spider)
+    sin contar el trabajo que hacen los consumidores entre elemento y elemento.
+    """
+    iterator = iter(iterable)
+    wall = cpu = 0.0
+    try:
+        while True:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                element = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                wall += time.perf_counter() - wall_start
+                cpu += time.process_time() - cpu_start
+            yield element
+    finally:
+        profiler.record(name, wall, cpu)
+
+
+async def timed_aiter(iterable, profiler, name):
+    """Versión de ``timed_iter`` para iterables asíncronos (salida asíncrona del spider)."""
+    iterator = iterable.__aiter__()
+    wall = cpu = 0.0
+    try:
+        while True:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                element = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                wall += time.perf_counter() - wall_start
+                cpu += time.process_time() - cpu_start
+            yield element
+    finally:
+        profiler.record(name, wall, cpu)
+
+
+def write_run_report(path, stats):
+    """Escribe en JSON las estadísticas de la crawl (incluidas las de perfilado)."""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2, sort_keys=True, default=str)
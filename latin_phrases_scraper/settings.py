@@ -23,8 +23,9 @@ ROBOTSTXT_OBEY = True
 
 # Concurrency and throttling settings
 #CONCURRENT_REQUESTS = 16
-CONCURRENT_REQUESTS_PER_DOMAIN = 1
-DOWNLOAD_DELAY = 1
+# Valores iniciales: AdaptiveConcurrencyMiddleware los ajusta durante la crawl
+CONCURRENT_REQUESTS_PER_DOMAIN = 2
+DOWNLOAD_DELAY = 0.25
 
 # Disable cookies (enabled by default)
 #COOKIES_ENABLED = False
@@ -40,15 +41,39 @@ DOWNLOAD_DELAY = 1
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "latin_phrases_scraper.middlewares.LatinPhrasesScraperSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    "latin_phrases_scraper.middlewares.LatinPhrasesScraperSpiderMiddleware": 543,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 #DOWNLOADER_MIDDLEWARES = {
 #    "latin_phrases_scraper.middlewares.LatinPhrasesScraperDownloaderMiddleware": 543,
 #}
+DOWNLOADER_MIDDLEWARES = {
+    "latin_phrases_scraper.middlewares.LatinPhrasesScraperDownloaderMiddleware": 543,
+    "latin_phrases_scraper.middlewares.AdaptiveConcurrencyMiddleware": 585,
+}
+
+# Recrawl incremental: peticiones condicionales (ETag/Last-Modified) y reuso
+# de los ítems de las páginas que no cambiaron desde la última crawl
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_PATH = ".page_cache/pages.sqlite3"
+
+# Grabación/reproducción de la crawl: "record" guarda todas las respuestas en
+# REPLAY_ARCHIVE y "replay" las sirve desde ahí sin acceder a la red
+REPLAY_MODE = None
+REPLAY_ARCHIVE = "replay/crawl.warc"
+
+# Concurrencia adaptativa por dominio: sube mientras la latencia está por
+# debajo del objetivo y se reduce a la mitad ante 429/503 o errores de red
+ADAPTIVE_CONCURRENCY_ENABLED = True
+ADAPTIVE_CONCURRENCY_MIN = 1
+ADAPTIVE_CONCURRENCY_MAX = 8
+ADAPTIVE_CONCURRENCY_TARGET_LATENCY = 1.0
+ADAPTIVE_CONCURRENCY_MIN_DELAY = 0.1
+ADAPTIVE_CONCURRENCY_MAX_DELAY = 30.0
+ADAPTIVE_CONCURRENCY_BACKOFF_CODES = [429, 503]
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
@@ -88,11 +113,107 @@ FEED_EXPORT_ENCODING = "utf-8"
 
 # Activa tu pipeline
 ITEM_PIPELINES = {
+   'latin_phrases_scraper.pipelines.NearDuplicatePipeline': 200,
    'latin_phrases_scraper.pipelines.LatinPhrasesPipeline': 300,
 }
 
+# Detección de frases casi duplicadas entre páginas (MinHash + LSH) antes de
+# exportar. DEDUP_POLICY: "keep_all" (por defecto) solo los informa y
+# "keep_first" los descarta (con el umbral aproximado puede descartar frases
+# distintas pero parecidas). Para fusionarlos: python -m latin_phrases_scraper.dedup
+DEDUP_ENABLED = True
+DEDUP_POLICY = "keep_all"
+DEDUP_THRESHOLD = 0.8
+DEDUP_NUM_PERM = 64
+DEDUP_BANDS = 16
+DEDUP_REPORT_PATH = "duplicados.json"
+
 # Configura un User-Agent real (importante para evitar bloqueos)
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 
 # Respeta los robots.txt (ética de scraping)
 ROBOTSTXT_OBEY = True
+
+# Los modelos de NLP se cargan bajo demanda; con True se precargan en segundo
+# plano al llegar el primer ítem, mientras la crawl continúa
+MODEL_WARMUP = True
+
+# Análisis en inglés con spaCy: tamaño de lote de nlp.pipe y número de procesos
+NLP_BATCH_SIZE = 1000
+NLP_N_PROCESS = 1
+
+# Análisis incremental: los contadores se actualizan con cada ítem en lugar de
+# procesar todo el corpus en close_spider
+ANALYSIS_INCREMENTAL = False
+
+# Análisis por campo e idioma ("campo:idioma"): los campos de un mismo idioma
+# comparten una pasada de nlp.pipe y cada texto distinto se analiza una vez;
+# el informe incluye palabras, verbos y POS por campo. Con "translation:en",
+# las frecuencias en inglés salen de esta pasada (el mismo coste que la pasada
+# en inglés de siempre). Cada campo añadido cuesta su propia pasada de spaCy;
+# ejemplos: "notes:en", "notes:es", "latin_phrase:la" (requieren el modelo del
+# idioma; si no está instalado, el campo se marca como no disponible). [] lo
+# desactiva
+ANALYSIS_FIELDS = ["translation:en"]
+ANALYSIS_SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "es": "es_core_news_sm",
+    "la": "la_core_web_sm",
+}
+
+# Exportación por bloques de los ítems: "jsonl", "csv" o "parquet" (pyarrow).
+# EXPORT_EXCEL_PATH añade una conversión final a Excel (None la desactiva)
+EXPORT_FORMAT = "jsonl"
+EXPORT_PATH = "latin_phrases_analysis.jsonl"
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_EXCEL_PATH = "latin_phrases_analysis.xlsx"
+
+# Frases relacionadas: TF-IDF de traducción y notas y los SIMILARITY_TOP_K
+# vecinos de cada frase, en un .npz junto a la exportación. Requiere NumPy y
+# SciPy, que no son dependencias del proyecto: desactivado (0) por defecto,
+# p. ej. 10 para activarlo. Consultas:
+#   python -m latin_phrases_scraper.similarity query latin_phrases_analysis.similarity.npz "carpe diem"
+SIMILARITY_TOP_K = 0
+
+# Procesos para el análisis final: con CLOSE_WORKERS > 0, close_spider
+# devuelve un Deferred y la conversión a Excel/índice, el conteo de latín y la
+# pasada de spaCy se ejecutan en paralelo fuera del reactor. 0 = síncrono.
+CLOSE_WORKERS = 3
+
+# Informe del análisis en formato JSON, además de analisis_frecuencias.txt
+REPORT_JSON_PATH = "analisis_frecuencias.json"
+
+# Índice invertido (tokens de latín e inglés -> filas) y de prefijos de las
+# frases, en un binario que se consulta con mmap. None lo desactiva. Consultas:
+#   python -m latin_phrases_scraper.index query latin_phrases.idx veritas
+INDEX_PATH = "latin_phrases.idx"
+
+# Caché persistente de los resultados de spaCy por fila (clave: hash del texto
+# y versión del modelo), con desalojo LRU por encima de NLP_CACHE_MAX_ENTRIES
+NLP_CACHE_ENABLED = True
+NLP_CACHE_PATH = ".nlp_cache/english.sqlite3"
+NLP_CACHE_MAX_ENTRIES = 500000
+
+# Generación de frases en español. GENERATION_BACKEND: "torch", "onnx" u
+# "onnx-int8" (los dos últimos requieren optimum[onnxruntime]). Con
+# GENERATION_SEED fijo, las frases se memorizan en GENERATION_CACHE_PATH y
+# las reejecuciones devuelven las mismas sin cargar el modelo
+GENERATION_MODEL = "PlanTL-GOB-ES/gpt2-base-bne"
+GENERATION_BACKEND = "torch"
+GENERATION_SEED = None
+GENERATION_CACHE_PATH = ".generation_cache/phrases.json"
+
+# Perfilado por etapas (tiempo de reloj, CPU y RSS pico) en las stats de la
+# crawl con el prefijo "profile/", e informe JSON de todas las stats al cerrar.
+# PROFILE_CLOSE_SPIDER_PATH guarda además un perfil cProfile de close_spider
+PROFILING_ENABLED = True
+RUN_REPORT_PATH = "run_report.json"
+PROFILE_CLOSE_SPIDER_PATH = None
+
+# Análisis de latín: patrón de tokens (sobre el texto en minúsculas), sufijos
+# que marcan un verbo, stopwords adicionales y número máximo de apariciones
+# para considerar rara (y descartar) una palabra
+LATIN_TOKEN_PATTERN = r"\b[a-z]{3,}\b"
+LATIN_VERB_SUFFIXES = ["are", "ere", "ire", "avi", "ivi", "atus", "itus"]
+LATIN_EXTRA_STOPWORDS = []
+LATIN_RARE_MAX_COUNT = 2
@@ -0,0 +1,277 @@
+"""Frases relacionadas por TF-IDF de su traducción y sus notas.
+
+Las filas se vectorizan en una matriz dispersa CSR (tf sublineal, idf
+suavizado y normalización L2), de modo que el producto ``X @ X.T`` da la
+similitud coseno. Los k vecinos de todas las filas se calculan por lotes,
+multiplicando la matriz dispersa por bloques densos y reduciendo con
+``argpartition`` (sin bucles por fila), y se guardan, junto con la matriz, en
+un ``.npz`` al lado de la exportación: las consultas solo leen los vecinos ya
+calculados. Uso::
+
+    python -m latin_phrases_scraper.similarity build latin_phrases_analysis.jsonl
+    python -m latin_phrases_scraper.similarity query latin_phrases_analysis.similarity.npz "carpe diem"
+"""
+import argparse
+import math
+import os
+import re
+import time
+
+from latin_phrases_scraper.index import normalize
+
+WORD_RE = re.compile(r"[^\W\d_]{2,}")
+
+# Palabras vacías del inglés más frecuentes (solo añaden ruido a la similitud)
+ENGLISH_STOPWORDS = frozenset("""
+    a an and are as at be by for from has have he her his i in is it its of on or
+    that the their they this to was were which who will with you your not but all
+""".split())
+
+TEXT_FIELDS = ('translation', 'notes')
+
+
+def similarity_path(export_path):
+    """Ruta del fichero de similitud junto a la exportación (``datos.jsonl`` -> ``datos.similarity.npz``)."""
+    return os.path.splitext(export_path)[0] + ".similarity.npz"
+
+
+def _terms(row):
+    text = " ".join(str(row.get(field) or "") for field in TEXT_FIELDS)
+    return [word for word in WORD_RE.findall(normalize(text)) if word not in ENGLISH_STOPWORDS]
+
+
+def _encode_strings(values):
+    """Textos como un buffer UTF-8 y sus offsets (igual que ``StringColumn``)."""
+    import numpy as np
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _decode_string(data, offsets, i):
+    return data[offsets[i]:offsets[i + 1]].tobytes().decode('utf-8')
+
+
+def tfidf_matrix(rows):
+    """Devuelve ``(X, vocabulario, idf, frases)`` con X en CSR ``float32`` normalizada por filas."""
+    import numpy as np
+    import scipy.sparse as sp
+
+    vocabulary = {}
+    phrases = []
+    indptr = [0]
+    indices, counts = [], []
+    for row in rows:
+        phrases.append(str(row.get('latin_phrase') or ""))
+        row_counts = {}
+        for term in _terms(row):
+            column = vocabulary.setdefault(term, len(vocabulary))
+            row_counts[column] = row_counts.get(column, 0) + 1
+        indices.extend(row_counts)
+        counts.extend(row_counts.values())
+        indptr.append(len(indices))
+
+    n_rows = len(phrases)
+    X = sp.csr_matrix(
+        (np.asarray(counts, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+         np.asarray(indptr, dtype=np.int64)),
+        shape=(n_rows, len(vocabulary)),
+    )
+    # tf sublineal e idf suavizado (como TfidfVectorizer(sublinear_tf=True))
+    np.log(X.data, out=X.data)
+    X.data += 1
+    df = np.bincount(X.indices, minlength=len(vocabulary))
+    idf = (np.log((1 + n_rows) / (1 + df)) + 1).astype(np.float32)
+    X = X.multiply(idf).tocsr()
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    X = sp.diags((1 / norms).astype(np.float32)).dot(X).tocsr()
+    terms = sorted(vocabulary, key=vocabulary.get)
+    return X, terms, idf, phrases
+
+
+def top_k_neighbors(X, k=10, batch_size=256):
+    """k vecinos más similares (sin la propia fila) de todas las filas de X.
+
+    Cada lote de filas se pasa a denso y se multiplica por X (disperso x
+    denso, mucho más rápido que disperso x disperso cuando el resultado está
+    casi lleno, como ocurre con las palabras frecuentes). El bloque de
+    similitudes (``batch_size`` x filas) se reduce con ``argpartition``; la
+    memoria máxima es la de un lote. Devuelve ``(vecinos int32, similitudes
+    float32)`` de forma (n, k); los huecos tienen vecino -1.
+    """
+    import numpy as np
+
+    n_rows = X.shape[0]
+    k = min(k, max(n_rows - 1, 0))
+    neighbors = np.full((n_rows, k), -1, dtype=np.int32)
+    scores = np.zeros((n_rows, k), dtype=np.float32)
+    if not k:
+        return neighbors, scores
+    for start in range(0, n_rows, batch_size):
+        stop = min(start + batch_size, n_rows)
+        similarities = np.ascontiguousarray((X @ X[start:stop].toarray().T).T)
+        # La propia fila no cuenta como vecina
+        similarities[np.arange(stop - start), np.arange(start, stop)] = -1
+        top = np.argpartition(similarities, n_rows - k, axis=1)[:, n_rows - k:]
+        top_scores = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top[top_scores <= 0] = -1
+        neighbors[start:stop] = top
+        scores[start:stop] = np.maximum(top_scores, 0)
+    return neighbors, scores
+
+
+def build_similarity(rows, path, k=10, batch_size=256):
+    """Calcula TF-IDF y vecinos de ``rows`` y los guarda en ``path`` (.npz sin comprimir).
+
+    Devuelve un dict con filas, términos, tamaño y tiempos.
+    """
+    import numpy as np
+
+    start = time.perf_counter()
+    X, terms, idf, phrases = tfidf_matrix(rows)
+    vectorized = time.perf_counter()
+    neighbors, scores = top_k_neighbors(X, k, batch_size)
+    finished = time.perf_counter()
+
+    phrase_data, phrase_offsets = _encode_strings(phrases)
+    term_data, term_offsets = _encode_strings(terms)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        np.savez(
+            f, data=X.data, indices=X.indices, indptr=X.indptr, shape=np.asarray(X.shape),
+            idf=idf, neighbors=neighbors, scores=scores,
+            phrase_data=phrase_data, phrase_offsets=phrase_offsets,
+            term_data=term_data, term_offsets=term_offsets,
+        )
+    return {
+        'rows': X.shape[0],
+        'terms': X.shape[1],
+        'k': neighbors.shape[1],
+        'bytes': os.path.getsize(path),
+        'tfidf_s': vectorized - start,
+        'top_k_s': finished - vectorized,
+    }
+
+
+class RelatedPhrases:
+    """Consultas sobre el fichero de similitud ya calculado."""
+
+    def __init__(self, path):
+        import numpy as np
+        with np.load(path) as arrays:
+            self.arrays = {name: arrays[name] for name in arrays.files}
+        self.neighbors = self.arrays['neighbors']
+        self.scores = self.arrays['scores']
+        self._rows_by_phrase = None
+        self._vocabulary = None
+        self._matrix = None
+
+    @classmethod
+    def open(cls, path):
+        return cls(path)
+
+    def __len__(self):
+        return len(self.neighbors)
+
+    def phrase(self, row_id):
+        return _decode_string(self.arrays['phrase_data'], self.arrays['phrase_offsets'], row_id)
+
+    def find(self, phrase):
+        """ID de la fila cuya frase latina coincide (sin mayúsculas ni diacríticos), o None."""
+        if self._rows_by_phrase is None:
+            self._rows_by_phrase = {}
+            for row_id in range(len(self)):
+                self._rows_by_phrase.setdefault(normalize(self.phrase(row_id)).strip(), row_id)
+        return self._rows_by_phrase.get(normalize(phrase).strip())
+
+    def related_to_row(self, row_id, k=None):
+        """Lista de ``(row_id, frase, similitud)`` precalculada para una fila."""
+        neighbors, scores = self.neighbors[row_id], self.scores[row_id]
+        related = [(int(other), self.phrase(other), float(score))
+                   for other, score in zip(neighbors, scores) if other >= 0]
+        return related[:k] if k is not None else related
+
+    def related(self, phrase, k=None):
+        """Frases relacionadas con una frase ya scrapeada (lista vacía si no se encuentra)."""
+        row_id = self.find(phrase)
+        return [] if row_id is None else self.related_to_row(row_id, k)
+
+    def search(self, text, k=10):
+        """Frases más parecidas a un texto libre en inglés (calcula su vector al vuelo)."""
+        import numpy as np
+        import scipy.sparse as sp
+
+        if self._vocabulary is None:
+            data, offsets = self.arrays['term_data'], self.arrays['term_offsets']
+            self._vocabulary = {_decode_string(data, offsets, i): i for i in range(len(offsets) - 1)}
+            self._matrix = sp.csr_matrix(
+                (self.arrays['data'], self.arrays['indices'], self.arrays['indptr']),
+                shape=tuple(self.arrays['shape']),
+            ).tocsc()
+        counts = {}
+        for term in _terms({'translation': text}):
+            column = self._vocabulary.get(term)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        if not counts:
+            return []
+        columns = np.fromiter(counts, dtype=np.int64)
+        weights = np.array([1 + math.log(count) for count in counts.values()], dtype=np.float32)
+        weights *= self.arrays['idf'][columns]
+        weights /= np.linalg.norm(weights)
+        similarities = self._matrix[:, columns] @ weights
+        k = min(k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [(int(row_id), self.phrase(row_id), float(similarities[row_id]))
+                for row_id in top if similarities[row_id] > 0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m latin_phrases_scraper.similarity",
+        description="Calcula y consulta las frases relacionadas (TF-IDF de traducción y notas).",
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="calcula los vecinos de un dataset exportado")
+    build.add_argument('dataset')
+    build.add_argument('--output', help="fichero .npz (por defecto, junto al dataset)")
+    build.add_argument('-k', type=int, default=10)
+    build.add_argument('--batch-size', type=int, default=256)
+    query = commands.add_parser('query', help="frases relacionadas con una frase o un texto")
+    query.add_argument('similarity')
+    query.add_argument('text')
+    query.add_argument('-k', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from latin_phrases_scraper.exporters import iter_export
+        output = args.output or similarity_path(args.dataset)
+        info = build_similarity(iter_export(args.dataset), output, args.k, args.batch_size)
+        print(f"[SUCCESS] Similitud de {info['rows']} frases ({info['terms']} términos) en '{output}': "
+              f"TF-IDF {info['tfidf_s']:.2f}s, top-{info['k']} {info['top_k_s']:.2f}s, "
+              f"{info['bytes'] / (1024 * 1024):.1f} MB")
+        return 0
+
+    related = RelatedPhrases.open(args.similarity)
+    start = time.perf_counter()
+    results = related.related(args.text, args.k)
+    if not results:
+        print("[INFO] La frase no está en el dataset: se busca como texto libre")
+        results = related.search(args.text, args.k)
+    elapsed = time.perf_counter() - start
+    for row_id, phrase, score in results:
+        print(f"{score:6.3f}  {row_id:>7}  {phrase}")
+    print(f"[INFO] {len(results)} resultados en {elapsed * 1e3:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
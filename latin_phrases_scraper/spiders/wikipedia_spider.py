@@ -1,6 +1,16 @@
+import re
+from urllib.parse import unquote, urljoin, urlparse
+
 import scrapy
 from latin_phrases_scraper.items import LatinPhraseItem
-import re
+
+# Subpáginas alfabéticas de la lista: List_of_Latin_phrases_(A), (B), ... (incluye rangos como (I–L))
+LETTER_PAGE_RE = re.compile(r'/wiki/List_of_Latin_phrases_\(([A-Z](?:[–-][A-Z])?)\)$')
+
+# Versión de la extracción de filas (extract_rows/cell_text). La caché de
+# páginas guarda las filas con esta versión y no reutiliza las de otra:
+# hay que incrementarla con cualquier cambio que altere las filas extraídas.
+EXTRACTOR_VERSION = 3
 
 class WikipediaLatinSpider(scrapy.Spider):
     name = "wikipedia_latin"  # Nombre único para correr el spider
@@ -9,33 +19,134 @@ class WikipediaLatinSpider(scrapy.Spider):
     # ¡AQUÍ ES DONDE PONDRÁS LA URL CORRECTA!
     # Este spider está listo para scrapear la tabla de frases.
     start_urls = ["https://en.wikipedia.org/wiki/List_of_Latin_phrases_(full)"]
+    extractor_version = EXTRACTOR_VERSION
+
+    def __init__(self, start_url=None, follow_letters=True, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Permite apuntar la crawl a otra copia (p. ej. un servidor HTTP local con páginas de prueba)
+        if start_url:
+            self.start_urls = [start_url]
+            self.allowed_domains = [urlparse(start_url).hostname]
+        # Los argumentos de "scrapy crawl -a" llegan como texto
+        self.follow_letters = str(follow_letters).lower() not in ('0', 'false', 'no')
+        # Filas ya emitidas: la misma fila aparece en (full) y en su subpágina
+        self.seen_phrases = set()
+        self.duplicate_phrases = 0
 
     def parse(self, response):
         """
         Método principal que Scrapy llama para procesar la respuesta.
         Aquí definimos las reglas para extraer los datos de la página HTML.
         """
-        # Buscamos TODAS las tablas en la página. Este selector es genérico.
-        # Para una página específica, podríamos afinar el selector (ej: 'table.wikitable').
-        tables = response.css('table.wikitable')
-        
-        for table in tables:
-            # Iteramos por cada fila (<tr>) de la tabla, saltando el encabezado
-            rows = table.css('tr')[1:]  # [1:] omite la primera fila (headers)
-            
-            for row in rows:
-                # Creamos un ítem para llenar con nuestros datos
-                item = LatinPhraseItem()
-                
-                # Extraemos el texto de las celdas (<td>). Usamos .get() para el primero y .getall() para posibles notas.
-                # Estos selectores CSS son el patrón a seguir para otras páginas.
-                cells = row.css('td')
-                
-                if len(cells) >= 2:  # Aseguramos que haya al menos 2 celdas (latín y traducción)
-                    item['latin_phrase'] = cells[0].css('::text').get("").strip()
-                    item['translation'] = cells[1].css('::text').get("").strip()
-                    # Unimos el texto de todas las celdas restantes como "notas"
-                    item['notes'] = " ".join([cell.css('::text').get("") for cell in cells[2:]]).strip()
-                    
-                    # Pasamos el ítem a nuestro pipeline para procesarlo
-                    yield item
+        root = response.selector.root
+
+        # Primero las subpáginas alfabéticas, para que se descarguen en
+        # paralelo mientras se procesa esta. El dupefilter de Scrapy evita
+        # pedir dos veces la misma página.
+        if self.follow_letters:
+            for url in letter_page_urls(root, response.url):
+                yield scrapy.Request(url, callback=self.parse)
+
+        # Recorremos el árbol lxml ya parseado de la respuesta una sola vez,
+        # sin crear un Selector por tabla, fila y celda.
+        rows = extract_rows(root)
+        if response.request is not None and "page_cache" in response.meta:
+            # La caché de páginas guarda las filas antes de deduplicar, para
+            # poder repetir la deduplicación cuando reutilice la página
+            rows = response.meta["page_rows"] = list(rows)
+        yield from self.unique_items(rows)
+
+    def unique_items(self, rows):
+        """Ítems de las filas ``(latin_phrase, translation, notes)`` que no se emitieron ya.
+
+        Una fila se repite si coinciden la frase y la traducción (ver
+        ``row_key``): la misma frase con otro significado se conserva.
+        """
+        for latin_phrase, translation, notes in rows:
+            key = row_key(latin_phrase, translation)
+            if key[0]:
+                if key in self.seen_phrases:
+                    self.duplicate_phrases += 1
+                    continue
+                self.seen_phrases.add(key)
+            # Pasamos el ítem a nuestro pipeline para procesarlo
+            yield LatinPhraseItem(latin_phrase=latin_phrase, translation=translation, notes=notes)
+
+    def closed(self, reason):
+        self.crawler.stats.set_value('wikipedia_latin/duplicate_phrases', self.duplicate_phrases)
+
+
+def row_key(latin_phrase, translation):
+    """Clave de deduplicación de una fila: frase y traducción sin mayúsculas ni espacios extra."""
+    return (" ".join((latin_phrase or "").casefold().split()),
+            " ".join((translation or "").casefold().split()))
+
+
+# Tablas con la clase "wikitable" (equivale al selector CSS 'table.wikitable')
+WIKITABLE_XPATH = '//table[contains(concat(" ", normalize-space(@class), " "), " wikitable ")]'
+
+# Etiquetas que separan palabras aunque no haya espacios en el HTML
+# (<td>Veni<br>vidi</td>, <p>uno</p><p>dos</p>)
+BLOCK_TAGS = frozenset(['br', 'p', 'div', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'tr', 'td', 'th'])
+
+
+def _is_noise(element):
+    """Nodos que no forman parte del texto de la frase: referencias [1] y estilos."""
+    tag = element.tag
+    if tag == 'style':
+        return True
+    return tag == 'sup' and 'reference' in (element.get('class') or '').split()
+
+
+def _collect_text(element, parts):
+    """Añade a ``parts`` el texto de ``element`` y de su cola, sin modificar el árbol."""
+    # Comentarios e instrucciones de proceso (tag no es str): solo cuenta su cola
+    if isinstance(element.tag, str) and not _is_noise(element):
+        block = element.tag in BLOCK_TAGS
+        if block:
+            parts.append(" ")
+        if element.text:
+            parts.append(element.text)
+        for child in element:
+            _collect_text(child, parts)
+        if block:
+            parts.append(" ")
+    if element.tail:
+        parts.append(element.tail)
+
+
+def cell_text(cell):
+    """Texto completo de una celda (incluye cursivas y enlaces) con espacios normalizados."""
+    parts = [cell.text or ""]
+    for child in cell:
+        _collect_text(child, parts)
+    return " ".join("".join(parts).split())
+
+
+def letter_page_urls(root, base_url):
+    """Devuelve las URLs absolutas de las subpáginas alfabéticas enlazadas en la página."""
+    urls = []
+    for href in root.xpath('//a[contains(@href, "List_of_Latin_phrases_")]/@href'):
+        href = href.split('#', 1)[0]
+        if LETTER_PAGE_RE.search(unquote(href)):
+            url = urljoin(base_url, href)
+            if url not in urls:
+                urls.append(url)
+    return urls
+
+
+def extract_rows(root):
+    """Genera tuplas ``(latin_phrase, translation, notes)`` de las tablas wikitable.
+
+    ``root`` es el elemento raíz lxml del documento. Las filas sin al menos
+    dos celdas <td> (por ejemplo, la de encabezados) se ignoran, y el texto de
+    las celdas restantes se une como notas.
+    """
+    for table in root.xpath(WIKITABLE_XPATH):
+        rows = table.iter('tr')
+        next(rows, None)  # omite la primera fila (headers)
+        for row in rows:
+            cells = [child for child in row if child.tag == 'td']
+            if len(cells) >= 2:  # al menos latín y traducción
+                notes = " ".join(filter(None, map(cell_text, cells[2:])))
+                yield cell_text(cells[0]), cell_text(cells[1]), notes
@@ -0,0 +1,164 @@
+from array import array
+
+from latin_phrases_scraper.exporters import FIELDS
+
+
+class StringColumn:
+    """Columna de textos al estilo Arrow: un buffer UTF-8 contiguo y un array de offsets.
+
+    Cada fila ocupa sus bytes UTF-8 más 8 bytes de offset, sin la cabecera de
+    un objeto ``str`` por valor; los textos vacíos solo cuestan el offset. El
+    texto se decodifica al leerlo.
+    """
+
+    __slots__ = ('data', 'offsets')
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('q', [0])
+
+    def append(self, value):
+        if value:
+            self.data += str(value).encode('utf-8')
+        self.offsets.append(len(self.data))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self):
+        data, offsets = self.data, self.offsets
+        for i in range(len(offsets) - 1):
+            yield data[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+    def freeze(self):
+        """Pasa el buffer de texto a ``bytes`` inmutables (una sola copia, al cerrar).
+
+        Arrow puede compartir unos ``bytes`` sin copiarlos; sobre el
+        ``bytearray`` vivo, la exportación del buffer haría fallar con
+        BufferError cualquier ``append`` posterior.
+        """
+        if not isinstance(self.data, bytes):
+            self.data = bytes(self.data)
+
+    def to_arrow(self):
+        """``pyarrow.LargeStringArray`` que comparte el buffer de texto congelado.
+
+        Solo se copian los offsets (8 bytes por fila).
+        """
+        import pyarrow as pa
+        self.freeze()
+        return pa.LargeStringArray.from_buffers(
+            len(self), pa.py_buffer(self.offsets.tobytes()), pa.py_buffer(self.data)
+        )
+
+    def to_pandas(self):
+        """Array de pandas sobre el array de Arrow; sin pyarrow, una columna de ``str``."""
+        import pandas as pd
+        try:
+            return pd.arrays.ArrowExtensionArray(self.to_arrow())
+        except ImportError:
+            return pd.array(list(self), dtype=object)
+
+
+class DictionaryColumn:
+    """Columna deduplicada: un código ``uint32`` por fila y cada texto distinto una sola vez.
+
+    Conviene para campos con muchos valores repetidos, como las notas (que a
+    menudo están vacías o se repiten entre frases).
+    """
+
+    __slots__ = ('codes', 'values', '_index')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self._index = {}
+
+    def append(self, value):
+        value = "" if value is None else str(value)
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def to_arrow(self):
+        """``pyarrow.DictionaryArray`` con cada texto distinto una sola vez (los códigos se copian)."""
+        import pyarrow as pa
+        indices = pa.Array.from_buffers(pa.uint32(), len(self), [None, pa.py_buffer(self.codes.tobytes())])
+        return pa.DictionaryArray.from_arrays(indices, pa.array(self.values, pa.string()))
+
+    def to_pandas(self):
+        """Serie categórica de pandas (los códigos se copian a un array NumPy)."""
+        import numpy as np
+        import pandas as pd
+        return pd.Categorical.from_codes(np.array(self.codes, dtype=np.int32), categories=self.values)
+
+
+# Tipo de columna por campo: las notas se repiten mucho; frase y traducción casi nunca
+COLUMN_TYPES = {
+    'latin_phrase': StringColumn,
+    'translation': StringColumn,
+    'notes': DictionaryColumn,
+}
+
+
+class PhraseStore:
+    """Almacén columnar en memoria de los ítems (en lugar de una lista de dicts).
+
+    Se llena fila a fila con ``append``; las etapas de análisis leen las
+    columnas directamente y el índice recorre las filas creadas al vuelo. Al
+    cerrar, ``freeze`` deja los buffers de texto inmutables y ``to_arrow`` /
+    ``to_pandas`` los entregan sin reconstruir los textos (p. ej. para Excel).
+    """
+
+    __slots__ = ('fields', 'columns')
+
+    def __init__(self, fields=FIELDS):
+        self.fields = tuple(fields)
+        self.columns = {field: COLUMN_TYPES.get(field, StringColumn)() for field in self.fields}
+
+    def append(self, row):
+        for field, column in self.columns.items():
+            column.append(row.get(field))
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]])
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        """Recorre las filas como dicts (se crean al vuelo)."""
+        for values in zip(*self.columns.values()):
+            yield dict(zip(self.fields, values))
+
+    def column(self, field):
+        """Recorre los valores de una columna."""
+        return iter(self.columns[field])
+
+    def freeze(self):
+        for column in self.columns.values():
+            if isinstance(column, StringColumn):
+                column.freeze()
+
+    def to_arrow(self):
+        import pyarrow as pa
+        return pa.table({field: column.to_arrow() for field, column in self.columns.items()})
+
+    def to_pandas(self):
+        import pandas as pd
+        return pd.DataFrame({field: column.to_pandas() for field, column in self.columns.items()})
@@ -0,0 +1,117 @@
+"""Etapas del análisis final que se ejecutan en un pool de procesos.
+
+Son funciones de módulo (importables y serializables con pickle) que reciben
+solo datos simples y devuelven ``(resultado, métricas)``, donde las métricas
+son el tiempo de reloj, el de CPU y el RSS pico del proceso de trabajo, para
+sumarlas al ``StageProfiler`` del proceso principal.
+"""
+import time
+from functools import partial
+
+from latin_phrases_scraper.analysis import UNUSED_SPACY_COMPONENTS, IncrementalAnalyzer, LatinCounter
+from latin_phrases_scraper.models import ModelRegistry, load_spacy_en, peak_rss_mb
+from latin_phrases_scraper.multilingual import MultiFieldAnalyzer
+
+
+def _run(function, *args, **kwargs):
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    result = function(*args, **kwargs)
+    metrics = {
+        'wall_s': time.perf_counter() - wall_start,
+        'cpu_s': time.process_time() - cpu_start,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    return result, metrics
+
+
+def latin_stage(latin_phrases, stopwords, counter=None):
+    """Cuenta palabras y verbos latinos; devuelve ``(word_freq, verb_freq, rare_words)``.
+
+    ``counter`` es un ``LatinCounter`` vacío con la configuración a usar.
+    """
+    counter = counter or LatinCounter()
+
+    def count():
+        counter.add_many(latin_phrases)
+        return counter.results(stopwords)
+    return _run(count)
+
+
+def english_stage(translations, batch_size=1000, n_process=1, cache_path=None, cache_max_entries=500000):
+    """Lemas y verbos en inglés con spaCy (cargado en este proceso solo si hace falta).
+
+    Devuelve ``(word_freq, verb_freq, estadísticas_de_caché, tiempos_de_carga)``.
+    """
+    def analyze():
+        models = ModelRegistry()
+        models.register('nlp_en', partial(load_spacy_en, exclude=UNUSED_SPACY_COMPONENTS))
+        cache = None
+        if cache_path:
+            from latin_phrases_scraper.nlp_cache import NlpCache, spacy_model_version
+            cache = NlpCache(cache_path, spacy_model_version("en_core_web_sm"), max_entries=cache_max_entries)
+        analyzer = IncrementalAnalyzer(lambda: models.get('nlp_en'), batch_size=batch_size,
+                                       n_process=n_process, cache=cache)
+        analyzer.add_translations(translations)
+        word_freq, verb_freq = analyzer.english_results()
+        cache_stats = None
+        if cache is not None:
+            cache_stats = cache.stats()
+            cache.close()
+        return word_freq, verb_freq, cache_stats, dict(models.load_times)
+    return _run(analyze)
+
+
+def fields_stage(columns, fields, batch_size=1000, n_process=1, cache_dir=None, cache_max_entries=500000,
+                 spacy_models=None):
+    """Análisis por campo e idioma (``MultiFieldAnalyzer``) de las columnas indicadas.
+
+    Devuelve ``(resultados_por_campo, estadísticas_de_caché, tiempos_de_carga)``.
+    """
+    def analyze():
+        models = ModelRegistry()
+        analyzer = MultiFieldAnalyzer(models, fields, batch_size=batch_size, n_process=n_process,
+                                      cache_dir=cache_dir, cache_max_entries=cache_max_entries,
+                                      spacy_models=spacy_models)
+        analyzer.add_columns(columns)
+        results = analyzer.results()
+        cache_stats = analyzer.cache_stats()
+        analyzer.close()
+        return results, cache_stats, dict(models.load_times)
+    return _run(analyze)
+
+
+def export_stage(export_path, export_format, excel_path=None, index_path=None, phrases=None):
+    """Conversión a Excel e índice de frases a partir del ``PhraseStore`` o del fichero exportado.
+
+    Devuelve la información de ``build_index`` (o None si no hay índice).
+    """
+    def export():
+        if excel_path:
+            from latin_phrases_scraper.exporters import convert_to_excel, phrases_to_excel
+            if phrases is not None:
+                phrases_to_excel(phrases, excel_path)
+            else:
+                convert_to_excel(export_path, excel_path, export_format)
+        if not index_path:
+            return None
+        from latin_phrases_scraper.exporters import iter_export
+        from latin_phrases_scraper.index import build_index
+        rows = phrases if phrases is not None else iter_export(export_path, export_format)
+        return build_index(rows, index_path)
+    return _run(export)
+
+
+def similarity_stage(export_path, export_format, output_path, k=10):
+    """Matriz TF-IDF y vecinos de cada frase a partir del fichero exportado.
+
+    El resultado es None si NumPy o SciPy no están instalados.
+    """
+    def build():
+        from latin_phrases_scraper.exporters import iter_export
+        from latin_phrases_scraper.similarity import build_similarity
+        try:
+            return build_similarity(iter_export(export_path, export_format), output_path, k)
+        except ImportError:
+            return None
+    return _run(build)